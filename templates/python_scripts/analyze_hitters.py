@@ -15,6 +15,7 @@ Required Lahman DB Tables:
 - Batting.csv (or batting table)
 - People.csv (or people/master table) 
 - Teams.csv (or teams table)
+- HallOfFame.csv (optional; labels for the trained HOF model)
 
 Author: Baseball Analytics Team
 Date: 2025-08-26
@@ -22,25 +23,223 @@ Date: 2025-08-26
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from scipy.cluster.hierarchy import dendrogram, linkage, fcluster
-from scipy.optimize import curve_fit
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix
+from pandas.api.types import union_categoricals
 import warnings
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+import weakref
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
+# scipy, scikit-learn, matplotlib and seaborn are imported inside the stages
+# that use them, so lookups and team queries start without paying for them
 warnings.filterwarnings('ignore')
-plt.style.use('seaborn-v0_8' if 'seaborn-v0_8' in plt.style.available else 'default')
 
 # ------------------------------------------------------------------
 # 1️⃣ Data Loading and Preprocessing
 # ------------------------------------------------------------------
 
-def load_lahman_data(data_path='./'):
+LAHMAN_TABLES = ('Batting', 'People', 'Teams')
+CACHE_DIR_NAME = '.lahman_cache'
+
+def _file_sha256(path, chunk_size=1 << 20):
+    """Hash a file in fixed-size chunks."""
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_is_fresh(csv_path, manifest_path):
+    
+    """
+    Check a cached table against its source CSV.
+    
+    Size and mtime are compared first; the content hash is only computed
+    when the mtime moved, so a touched-but-unchanged file stays cached.
+    """
+    
+    if not os.path.exists(manifest_path):
+        return False
+    
+    with open(manifest_path) as fh:
+        manifest = json.load(fh)
+    
+    stat = os.stat(csv_path)
+    if stat.st_size != manifest.get('size'):
+        return False
+    if stat.st_mtime_ns == manifest.get('mtime_ns'):
+        return True
+    
+    if _file_sha256(csv_path) != manifest.get('sha256'):
+        return False
+    
+    # Same content, new mtime: refresh the manifest so the next load skips hashing
+    manifest['mtime_ns'] = stat.st_mtime_ns
+    with open(manifest_path, 'w') as fh:
+        json.dump(manifest, fh)
+    return True
+
+# Batting columns the analysis pipeline actually reads
+BATTING_COLUMNS = ['playerID', 'yearID', 'stint', 'teamID', 'lgID', 'G', 'AB', 'R', 'H',
+                   '2B', '3B', 'HR', 'RBI', 'SB', 'BB', 'SO', 'HBP', 'SH', 'SF', 'GIDP']
+PARQUET_ROW_GROUP_SIZE = 20_000
+CSV_CHUNK_SIZE = 100_000
+
+def _batting_filters(min_year=None, min_ab=None):
+    """Express the year/AB cutoffs as Parquet-style (column, '>=', value) predicates."""
+    
+    filters = []
+    if min_year is not None:
+        filters.append(('yearID', '>=', min_year))
+    if min_ab is not None:
+        filters.append(('AB', '>=', min_ab))
+    return filters
+
+def _apply_filters(df, filters):
+    """Evaluate _batting_filters predicates in memory (only '>=' is produced)."""
+    
+    mask = np.ones(len(df), dtype=bool)
+    for col, _, value in filters:
+        mask &= (df[col] >= value).to_numpy()
+    return df[mask]
+
+def _select(df, columns=None, filters=None):
+    """Apply column and row pushdown to a frame that is already in memory."""
+    
+    if filters:
+        df = _apply_filters(df, filters).reset_index(drop=True)
+    if columns is not None:
+        df = df[[col for col in df.columns if col in columns]]
+    return df
+
+def _read_csv_pushdown(csv_path, columns=None, filters=None):
+    
+    """
+    Read a CSV with usecols and chunk-wise filtering, so rows failing the
+    predicates and unused columns are never held in memory all at once.
+    """
+    
+    if columns is None and not filters:
+        return pd.read_csv(csv_path)
+    
+    usecols = None
+    if columns is not None:
+        wanted = set(columns) | {col for col, _, _ in filters or []}
+        usecols = lambda col: col in wanted
+    
+    chunks = [
+        _apply_filters(chunk, filters or [])
+        for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=CSV_CHUNK_SIZE)
+    ]
+    return _select(pd.concat(chunks, ignore_index=True), columns)
+
+def _read_table_cached(csv_path, cache_dir, refresh_cache=False, columns=None, filters=None):
+    
+    """
+    Read one Lahman CSV through the Parquet cache.
+    
+    columns and filters are pushed into the Parquet read, where row-group
+    statistics let pyarrow skip groups that cannot match. Lahman CSVs are
+    ordered by year, so year cutoffs prune most early row groups.
+    
+    Returns the frame and whether it was served from the cache.
+    """
+    
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    parquet_path = os.path.join(cache_dir, f'{name}.parquet')
+    manifest_path = os.path.join(cache_dir, f'{name}.json')
+    
+    if (not refresh_cache and os.path.exists(parquet_path)
+            and _cache_is_fresh(csv_path, manifest_path)):
+        if columns is not None:
+            with open(manifest_path) as fh:
+                cached_columns = json.load(fh).get('columns', [])
+            columns = [col for col in cached_columns if col in columns]
+        return pd.read_parquet(parquet_path, columns=columns, filters=filters or None), True
+    
+    table = pd.read_csv(csv_path)
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table.to_parquet(parquet_path, index=False, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        stat = os.stat(csv_path)
+        with open(manifest_path, 'w') as fh:
+            json.dump({
+                'source': os.path.basename(csv_path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': _file_sha256(csv_path),
+                'columns': list(table.columns)
+            }, fh)
+    except Exception as e:
+        print(f"Warning: could not cache {name}: {e}")
+    
+    return _select(table, columns, filters), False
+
+# Compact load schema: categoricals for IDs, small ints for counting stats.
+# Counting columns that contain NaN (SF, HBP, CS... in early seasons) fall
+# back to float32, which stores every realistic count exactly.
+COUNTING_STATS = ['G', 'AB', 'R', 'H', '2B', '3B', 'HR', 'RBI', 'SB', 'CS',
+                  'BB', 'SO', 'IBB', 'HBP', 'SH', 'SF', 'GIDP']
+COMPACT_SCHEMA = {
+    'Batting': {
+        'playerID': 'category', 'teamID': 'category', 'lgID': 'category',
+        'yearID': 'int16', 'stint': 'int8',
+        **{col: 'int16' for col in COUNTING_STATS}
+    },
+    'People': {'bats': 'category', 'throws': 'category', 'birthCountry': 'category'},
+    'Teams': {'teamID': 'category', 'lgID': 'category', 'franchID': 'category',
+              'divID': 'category', 'yearID': 'int16'}
+}
+RATE_STATS = ['AVG', 'OBP', 'SLG', 'OPS', 'ISO', 'BB_rate', 'K_rate', 'HR_rate', 'wOBA']
+
+def _memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+def apply_compact_schema(df, schema):
+    
+    """
+    Cast columns of a raw Lahman table to the compact schema.
+    
+    Integer targets are widened to int32 when the values do not fit and
+    replaced by float32 when the column has missing values.
+    """
+    
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+            continue
+        
+        values = df[col]
+        if values.isna().any():
+            df[col] = values.astype('float32')
+            continue
+        
+        info = np.iinfo(dtype)
+        if values.min() < info.min or values.max() > info.max:
+            dtype = 'int32'
+        df[col] = values.astype(dtype)
+    
+    return df
+
+def load_lahman_data(data_path='./', use_cache=True, refresh_cache=False, cache_dir=None,
+                     compact=False, min_year=None, min_ab=None, columns=None):
 
     """
     Load Lahman Baseball Database tables.
@@ -49,15 +248,57 @@ def load_lahman_data(data_path='./'):
     - Batting.csv: Player batting statistics by year
     - People.csv: Player biographical information  
     - Teams.csv: Team information
+    
+    With use_cache, each table is kept as Parquet in cache_dir (default
+    data_path/.lahman_cache) and rebuilt only when its CSV changes
+    (size, mtime, SHA-256). refresh_cache forces a rebuild. Requires
+    pyarrow; without it the CSVs are read directly.
+    
+    With compact, COMPACT_SCHEMA is applied to each table and memory use
+    before and after is reported.
+    
+    min_year, min_ab and columns are pushed down into the Batting read
+    (Parquet row-group filters on the cache, usecols plus chunked filtering
+    on CSV), so excluded seasons and unused columns are never materialized.
+    Pass columns=BATTING_COLUMNS to keep only what the pipeline reads.
     """
     
     print("Loading Lahman Baseball Database...")
     
+    if use_cache and importlib.util.find_spec('pyarrow') is None:
+        print("pyarrow not installed - reading CSVs without cache")
+        use_cache = False
+    
+    if cache_dir is None:
+        cache_dir = f'{data_path}{CACHE_DIR_NAME}'
+    
     try:
         # Load main tables
-        batting = pd.read_csv(f'{data_path}Batting.csv')
-        people = pd.read_csv(f'{data_path}People.csv')
-        teams = pd.read_csv(f'{data_path}Teams.csv')
+        tables = {}
+        for name in LAHMAN_TABLES:
+            csv_path = f'{data_path}{name}.csv'
+            # Only Batting is large enough to be worth pushing filters into
+            if name == 'Batting':
+                read_columns, filters = columns, _batting_filters(min_year, min_ab)
+            else:
+                read_columns, filters = None, None
+            
+            if use_cache:
+                tables[name], hit = _read_table_cached(csv_path, cache_dir, refresh_cache,
+                                                       read_columns, filters)
+                print(f"✓ {name}.csv {'(cached)' if hit else '(parsed, cache rebuilt)'}")
+            else:
+                tables[name] = _read_csv_pushdown(csv_path, read_columns, filters)
+        
+        if compact:
+            print("Applying compact schema:")
+            for name in LAHMAN_TABLES:
+                before = _memory_mb(tables[name])
+                tables[name] = apply_compact_schema(tables[name], COMPACT_SCHEMA[name])
+                after = _memory_mb(tables[name])
+                print(f"  {name:8s} {before:8.1f} MB -> {after:8.1f} MB")
+        
+        batting, people, teams = tables['Batting'], tables['People'], tables['Teams']
         
         print(f"✓ Batting data: {len(batting)} records")
         print(f"✓ People data: {len(people)} players") 
@@ -77,9 +318,250 @@ def load_lahman_data(data_path='./'):
         print(f"Unexpected error: {e}")
         return None, None, None
 
-def preprocess_batting_data(batting, people, teams, min_year=1950, min_ab=100):
+# Columns treated as 0 when missing, matching preprocess_batting_data
+METRIC_FILL_ZERO = ['H', 'AB', 'BB', 'SO', 'HBP', 'SF', 'SH', 'GIDP']
+
+# wOBA linear weights (modern); per-season tables use the same column names
+DEFAULT_METRIC_WEIGHTS = {'wBB': 0.692, 'wHBP': 0.722, 'w1B': 0.883,
+                          'w2B': 1.238, 'w3B': 1.558, 'wHR': 1.979}
+EXPECTED_BABIP = 0.300  # League average approximation
+
+def _metric_obp(c, out, tmp, w):
+    np.add(c['AB'], c['BB'], out=tmp)
+    tmp += c['HBP']
+    tmp += c['SF']
+    np.add(c['H'], c['BB'], out=out)
+    out += c['HBP']
+    out /= tmp
+
+def _metric_slg(c, out, tmp, w):
+    np.add(c['H'], c['2B'], out=out)
+    np.multiply(2, c['3B'], out=tmp)
+    out += tmp
+    np.multiply(3, c['HR'], out=tmp)
+    out += tmp
+    out /= c['AB']
+
+def _metric_per_pa_denominator(stat):
+    def formula(c, out, tmp, w):
+        np.add(c['AB'], c['BB'], out=tmp)
+        np.divide(c[stat], tmp, out=out)
+    return formula
+
+def _metric_woba(c, out, tmp, w):
+    np.multiply(w['wBB'], c['BB'], out=out)
+    for event in ['HBP', '1B', '2B', '3B', 'HR']:
+        np.multiply(w[f'w{event}'], c[event], out=tmp)
+        out += tmp
+    out /= c['PA']
+
+def _metric_babip(c, out, tmp, w):
+    np.subtract(c['AB'], c['SO'], out=tmp)
+    tmp -= c['HR']
+    np.subtract(c['H'], c['HR'], out=out)
+    out /= tmp
+
+def _metric_singles(c, out, tmp, w):
+    np.subtract(c['H'], c['2B'], out=out)
+    out -= c['3B']
+    out -= c['HR']
+
+def _metric_pa(c, out, tmp, w):
+    np.add(c['AB'], c['BB'], out=out)
+    for col in ['HBP', 'SF', 'SH']:
+        out += c[col]
+
+# name -> (inputs, weights used, formula writing into out)
+# Inputs are frame columns or other registry metrics; formulas may use tmp
+# as scratch space and w for per-row (or scalar) weights
+METRIC_REGISTRY = {
+    '1B': (['H', '2B', '3B', 'HR'], [], _metric_singles),
+    'PA': (['AB', 'BB', 'HBP', 'SF', 'SH'], [], _metric_pa),
+    'AVG': (['H', 'AB'], [], lambda c, out, tmp, w: np.divide(c['H'], c['AB'], out=out)),
+    'OBP': (['H', 'AB', 'BB', 'HBP', 'SF'], [], _metric_obp),
+    'SLG': (['H', '2B', '3B', 'HR', 'AB'], [], _metric_slg),
+    'OPS': (['OBP', 'SLG'], [], lambda c, out, tmp, w: np.add(c['OBP'], c['SLG'], out=out)),
+    'ISO': (['SLG', 'AVG'], [], lambda c, out, tmp, w: np.subtract(c['SLG'], c['AVG'], out=out)),
+    'BB_rate': (['BB', 'AB'], [], _metric_per_pa_denominator('BB')),
+    'K_rate': (['SO', 'AB', 'BB'], [], _metric_per_pa_denominator('SO')),
+    'HR_rate': (['HR', 'AB'], [], lambda c, out, tmp, w: np.divide(c['HR'], c['AB'], out=out)),
+    'wOBA': (['BB', 'HBP', '1B', '2B', '3B', 'HR', 'PA'], list(DEFAULT_METRIC_WEIGHTS), _metric_woba),
+    'BABIP': (['H', 'HR', 'AB', 'SO'], [], _metric_babip),
+    'BABIP_luck': (['BABIP'], [],
+                   lambda c, out, tmp, w: np.subtract(c['BABIP'], EXPECTED_BABIP, out=out)),
+}
+
+# Count metrics keep an integer dtype when all their input columns are integers
+INTEGER_METRICS = {'1B', 'PA'}
+
+# Metrics preprocess_batting_data adds, in column order
+PREPROCESS_METRICS = ['AVG', 'OBP', 'SLG', 'OPS', 'ISO', 'BB_rate', 'K_rate', 'HR_rate', '1B', 'wOBA']
+
+# The registry formulas as SQL for the lazy backends; {name} expands to
+# another metric's expression and {wXX} to a (per-season) weight
+METRIC_SQL = {
+    '1B': '"H" - "2B" - "3B" - "HR"',
+    'PA': '"AB" + "BB" + "HBP" + "SF" + "SH"',
+    'AVG': 'CAST("H" AS DOUBLE) / "AB"',
+    'OBP': 'CAST("H" + "BB" + "HBP" AS DOUBLE) / ("AB" + "BB" + "HBP" + "SF")',
+    'SLG': 'CAST("H" + "2B" + 2 * "3B" + 3 * "HR" AS DOUBLE) / "AB"',
+    'OPS': '{OBP} + {SLG}',
+    'ISO': '{SLG} - {AVG}',
+    'BB_rate': 'CAST("BB" AS DOUBLE) / ("AB" + "BB")',
+    'K_rate': 'CAST("SO" AS DOUBLE) / ("AB" + "BB")',
+    'HR_rate': 'CAST("HR" AS DOUBLE) / "AB"',
+    'wOBA': ('({wBB} * "BB" + {wHBP} * "HBP" + {w1B} * {1B} + {w2B} * "2B" + {w3B} * "3B"'
+             ' + {wHR} * "HR") / {PA}'),
+    'BABIP': 'CAST("H" - "HR" AS DOUBLE) / ("AB" - "SO" - "HR")',
+    'BABIP_luck': f'{{BABIP}} - CAST({EXPECTED_BABIP!r} AS DOUBLE)',
+}
+
+def _metric_plan(metrics):
+    """Registry metrics needed for `metrics`, dependencies first, and the frame columns they read."""
+    
+    order, columns, visiting = [], [], set()
+    
+    def visit(name):
+        if name in order or name in columns:
+            return
+        if name not in METRIC_REGISTRY:
+            columns.append(name)
+            return
+        if name in visiting:
+            raise ValueError(f"Circular metric dependency at {name}")
+        visiting.add(name)
+        for dep in METRIC_REGISTRY[name][0]:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+    
+    for name in metrics:
+        if name not in METRIC_REGISTRY:
+            raise KeyError(f"Unknown metric: {name} (registered: {', '.join(METRIC_REGISTRY)})")
+        visit(name)
+    return order, columns
+
+def _season_weights(years, names, weights=None):
+    
+    """
+    Per-row weight arrays gathered from a per-season table (indexed by
+    yearID) by array indexing; seasons or columns missing from the table
+    fall back to DEFAULT_METRIC_WEIGHTS. Without a table the defaults are
+    returned as scalars.
+    """
+    
+    if weights is None or len(years) == 0:
+        return {name: DEFAULT_METRIC_WEIGHTS[name] for name in names}
+    
+    first = years.min()
+    span = np.arange(first, years.max() + 1)
+    table = weights.reindex(span)
+    positions = years - first
+    
+    per_row = {}
+    for name in names:
+        if name in table.columns:
+            season_values = table[name].fillna(DEFAULT_METRIC_WEIGHTS[name]).to_numpy(np.float64)
+            per_row[name] = season_values[positions]
+        else:
+            per_row[name] = DEFAULT_METRIC_WEIGHTS[name]
+    return per_row
+
+def compute_metrics(df, metrics=PREPROCESS_METRICS, weights=None):
+    
+    """
+    Compute registry metrics for every row of df in one pass.
+    
+    Only the requested metrics and their dependencies are computed, in
+    dependency order, each written into a row of one preallocated buffer
+    (intermediate results are reused, not recomputed). Input columns are
+    read once as float64 (METRIC_FILL_ZERO columns with NaN as 0); df is
+    not modified. weights is an optional per-season table indexed by
+    yearID with DEFAULT_METRIC_WEIGHTS columns (e.g. FanGraphs wOBA
+    constants), applied per row by year.
+    
+    Returns a new DataFrame of the requested metrics aligned to df.index;
+    INTEGER_METRICS computed from integer columns keep an integer dtype.
+    """
+    
+    order, columns = _metric_plan(metrics)
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise KeyError(f"Columns required by {list(metrics)} are missing: {missing}")
+    
+    n = len(df)
+    values = {}
+    for col in columns:
+        values[col] = df[col].to_numpy(np.float64, na_value=np.nan)
+        if col in METRIC_FILL_ZERO:
+            values[col] = np.nan_to_num(values[col], nan=0.0)
+    
+    weight_names = list(dict.fromkeys(name for metric in order for name in METRIC_REGISTRY[metric][1]))
+    years = df['yearID'].to_numpy(np.int64) if weight_names and weights is not None else np.empty(0, np.int64)
+    per_row_weights = _season_weights(years, weight_names, weights)
+    
+    # Requested metrics occupy the first rows, so the result is a view of the buffer
+    rows = list(dict.fromkeys(list(metrics) + order))
+    buffer = np.empty((len(rows), n))
+    tmp = np.empty(n)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in order:
+            out = buffer[rows.index(name)]
+            METRIC_REGISTRY[name][2](values, out, tmp, per_row_weights)
+            values[name] = out
+    
+    result = pd.DataFrame(buffer[:len(metrics)].T, index=df.index, columns=list(metrics), copy=False)
+    
+    for name in INTEGER_METRICS.intersection(metrics):
+        dtypes = [df[col].dtype for col in _metric_plan([name])[1]]
+        if all(pd.api.types.is_integer_dtype(dtype) for dtype in dtypes):
+            result[name] = result[name].astype(np.result_type(*dtypes))
+    
+    return result
+
+# People attributes carried onto every season row
+PEOPLE_COLUMNS = ['nameFirst', 'nameLast', 'birthYear', 'debut', 'finalGame']
+
+def encode_keys(values, lookup=None):
+    
+    """
+    Dense integer codes for an ID column and the lookup array they index.
+    
+    Without lookup the codes number the distinct IDs of values; with one
+    (e.g. People's playerID column) they are positions in it. Unknown or
+    missing IDs get -1. Categorical input is encoded through its
+    categories, so each distinct ID is hashed once rather than per row.
+    """
+    
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        if lookup is None:
+            return codes, values.cat.categories.to_numpy()
+        positions = pd.Index(np.asarray(lookup)).get_indexer(values.cat.categories)
+        return np.where(codes >= 0, positions[codes], -1), np.asarray(lookup)
+    
+    if lookup is None:
+        codes, uniques = pd.factorize(values)
+        return codes, np.asarray(uniques)
+    return pd.Index(np.asarray(lookup)).get_indexer(values), np.asarray(lookup)
+
+def take_by_code(values, codes):
+    """values[codes] for a Series, with -1 codes giving missing values (ints widen to float only then)."""
+    array = values.array if isinstance(values.dtype, pd.api.extensions.ExtensionDtype) else values.to_numpy()
+    return pd.api.extensions.take(array, codes, allow_fill=True)
+
+def preprocess_batting_data(batting, people, teams, min_year=1950, min_ab=100, compact=False,
+                            metric_weights=None):
     
-    """Clean and preprocess batting data with advanced metrics."""
+    """
+    Clean and preprocess batting data with advanced metrics.
+    
+    With compact, rate stats are stored as float32 and the ID and name
+    columns as categoricals (use with load_lahman_data(compact=True)).
+    metric_weights is an optional per-season weight table for
+    compute_metrics (e.g. yearly wOBA constants).
+    """
     
     print(f"\nPreprocessing batting data (>= {min_year}, >= {min_ab} AB)...")
     
@@ -97,82 +579,342 @@ def preprocess_batting_data(batting, people, teams, min_year=1950, min_ab=100):
         if col in batting_clean.columns:
             batting_clean[col] = batting_clean[col].fillna(0)
     
-    # Calculate basic metrics
-    batting_clean['AVG'] = batting_clean['H'] / batting_clean['AB']
-    batting_clean['OBP'] = (batting_clean['H'] + batting_clean['BB'] + batting_clean['HBP']) / (
-        batting_clean['AB'] + batting_clean['BB'] + batting_clean['HBP'] + batting_clean['SF']
-    )
-    batting_clean['SLG'] = (
-        batting_clean['H'] + batting_clean['2B'] + 2*batting_clean['3B'] + 3*batting_clean['HR']
-    ) / batting_clean['AB']
-    
-    # Advanced metrics
-    batting_clean['OPS'] = batting_clean['OBP'] + batting_clean['SLG']
-    batting_clean['ISO'] = batting_clean['SLG'] - batting_clean['AVG']
-    
-    # Rate stats
-    batting_clean['BB_rate'] = batting_clean['BB'] / (batting_clean['AB'] + batting_clean['BB'])
-    batting_clean['K_rate'] = batting_clean['SO'] / (batting_clean['AB'] + batting_clean['BB'])
-    batting_clean['HR_rate'] = batting_clean['HR'] / batting_clean['AB']
-    
-    # Calculate singles
-    batting_clean['1B'] = batting_clean['H'] - batting_clean['2B'] - batting_clean['3B'] - batting_clean['HR']
-    
-    # wOBA calculation (using modern weights)
-    woba_weights = {
-        'BB': 0.692, 'HBP': 0.722, '1B': 0.883,
-        '2B': 1.238, '3B': 1.558, 'HR': 1.979
-    }
-    
-    plate_appearances = (batting_clean['AB'] + batting_clean['BB'] + 
-                        batting_clean['HBP'] + batting_clean['SF'] + batting_clean['SH'])
+    # Season metrics from the registry in one pass over preallocated buffers
+    metrics = compute_metrics(batting_clean, PREPROCESS_METRICS, weights=metric_weights)
+    batting_clean = pd.concat([batting_clean, metrics], axis=1)
     
-    batting_clean['wOBA'] = (
-        woba_weights['BB'] * batting_clean['BB'] +
-        woba_weights['HBP'] * batting_clean['HBP'] +
-        woba_weights['1B'] * batting_clean['1B'] +
-        woba_weights['2B'] * batting_clean['2B'] +
-        woba_weights['3B'] * batting_clean['3B'] +
-        woba_weights['HR'] * batting_clean['HR']
-    ) / plate_appearances
-    
-    # Merge with player info
+    # Player info: playerIDs are encoded once as row positions in People and
+    # each attribute is gathered by position rather than by a string-keyed merge
+    batting_clean = batting_clean.reset_index(drop=True)
     if people is not None:
-        people_subset = people[['playerID', 'nameFirst', 'nameLast', 'birthYear', 'debut', 'finalGame']].copy()
-        batting_enhanced = batting_clean.merge(people_subset, on='playerID', how='left')
-        batting_enhanced['fullName'] = batting_enhanced['nameFirst'] + ' ' + batting_enhanced['nameLast']
+        people = people.drop_duplicates('playerID')
+        player_codes, _ = encode_keys(batting_clean['playerID'], people['playerID'])
+        player_info = {col: take_by_code(people[col], player_codes) for col in PEOPLE_COLUMNS}
+        
+        # Names are built once per player, not once per season
+        full_names = people['nameFirst'] + ' ' + people['nameLast']
+        if compact:
+            # Integer name codes into a sorted lookup array, resolved only when displayed
+            name_codes, names = pd.factorize(full_names, sort=True)
+            name_codes = np.where(player_codes >= 0, name_codes[player_codes], -1)
+            player_info['fullName'] = pd.Categorical.from_codes(name_codes, names)
+        else:
+            player_info['fullName'] = take_by_code(full_names, player_codes)
+        
+        batting_enhanced = pd.concat([batting_clean, pd.DataFrame(player_info)], axis=1)
         batting_enhanced['age'] = batting_enhanced['yearID'] - batting_enhanced['birthYear']
     else:
         batting_enhanced = batting_clean.copy()
         batting_enhanced['fullName'] = batting_enhanced['playerID']
         batting_enhanced['age'] = np.nan
     
+    if compact:
+        before = _memory_mb(batting_enhanced)
+        batting_enhanced[RATE_STATS] = batting_enhanced[RATE_STATS].astype('float32')
+        for col in ['playerID', 'teamID', 'lgID', 'fullName']:
+            if col in batting_enhanced.columns:
+                # Drop categories of filtered-out rows so groupbys stay dense
+                batting_enhanced[col] = batting_enhanced[col].astype('category').cat.remove_unused_categories()
+        print(f"Compact frame: {before:.1f} MB -> {_memory_mb(batting_enhanced):.1f} MB")
+    
     print(f"Final dataset: {len(batting_enhanced)} player-seasons")
     return batting_enhanced
 
+# Batting counting stats that add up across a player's stints
+STINT_SUM_COLUMNS = ['G', 'AB', 'R', 'H', '2B', '3B', 'HR', 'RBI', 'SB', 'CS', 'BB', 'SO',
+                     'IBB', 'HBP', 'SH', 'SF', 'GIDP']
+
+def combine_stints(df, keys=('playerID', 'yearID')):
+    
+    """
+    One row per keys group for split seasons: counting stats are summed
+    over the stints, other columns come from the first stint and
+    PREPROCESS_METRICS are recomputed from the sums. A frame with no
+    repeated keys is returned as is.
+    """
+    
+    keys = list(keys)
+    if not df.duplicated(keys).any():
+        return df
+    
+    grouped = df.groupby(keys, sort=False, observed=True)
+    combined = grouped.first()
+    sums = [col for col in STINT_SUM_COLUMNS if col in df.columns]
+    combined[sums] = grouped[sums].sum()
+    combined = combined.reset_index()[df.columns]
+    
+    metrics = [name for name in PREPROCESS_METRICS if name in df.columns]
+    combined[metrics] = compute_metrics(combined, metrics)
+    return combined
+
+# Lazy query backends: the same SQL plan runs on Polars (LazyFrame via its
+# SQL context) or DuckDB directly over the cached Parquet files
+QUERY_BACKENDS = ('pandas', 'polars', 'duckdb')
+
+def _metric_sql(name, weighted=False):
+    """Expand a METRIC_SQL template into a self-contained expression."""
+    
+    def expand(key):
+        if key in METRIC_SQL:
+            return f'({_metric_sql(key, weighted)})'
+        default = f'CAST({DEFAULT_METRIC_WEIGHTS[key]!r} AS DOUBLE)'
+        return f'COALESCE("{key}", {default})' if weighted else default
+    
+    template = METRIC_SQL[name]
+    keys = {key for key in list(METRIC_SQL) + list(DEFAULT_METRIC_WEIGHTS) if f'{{{key}}}' in template}
+    return template.format(**{key: expand(key) for key in keys})
+
+def _seasons_sql(batting_columns, min_year, min_ab, metrics=PREPROCESS_METRICS, weighted=False):
+    
+    """
+    SQL for the preprocessed season table: the same filter, zero-fill,
+    metrics and People join as preprocess_batting_data, in the same
+    column and row order (rows keep their Parquet file order).
+    """
+    
+    filled = [f'COALESCE("{col}", 0) AS "{col}"' if col in METRIC_FILL_ZERO else f'"{col}"'
+              for col in batting_columns]
+    # NaN (0/0) becomes NULL so aggregates skip it the way pandas does
+    not_nan = "CAST('NaN' AS DOUBLE)"
+    metric_columns = [f'{_metric_sql(name)} AS "{name}"' if name in INTEGER_METRICS
+                      else f'NULLIF({_metric_sql(name, weighted)}, {not_nan}) AS "{name}"'
+                      for name in metrics]
+    weights_join = ' LEFT JOIN weights USING ("yearID")' if weighted else ''
+    
+    return f"""
+        WITH filtered AS (
+            SELECT file_row_number, {', '.join(filled)}
+            FROM batting
+            WHERE "yearID" >= {int(min_year)} AND "AB" >= {int(min_ab)}
+        ),
+        measured AS (
+            SELECT filtered.*, {', '.join(metric_columns)}
+            FROM filtered{weights_join}
+        )
+        SELECT {', '.join(f'measured."{col}"' for col in batting_columns + list(metrics))},
+               {', '.join(f'people."{col}"' for col in PEOPLE_COLUMNS)},
+               people."nameFirst" || ' ' || people."nameLast" AS "fullName",
+               measured."yearID" - people."birthYear" AS "age"
+        FROM measured LEFT JOIN people ON measured."playerID" = people."playerID"
+        ORDER BY measured.file_row_number
+    """
+
+def _sum_sql(col, alias):
+    """SUM as pandas does it: 0 for an empty group and int64 rather than DuckDB's HUGEINT."""
+    return f'CAST(COALESCE(SUM("{col}"), 0) AS BIGINT) AS "{alias}"'
+
+def _run_lazy_queries(backend, queries, parquet_paths, frames=None):
+    
+    """
+    Run {name: sql} queries on a lazy backend and collect each result as
+    pandas. Every cached table is registered under its lowercase name
+    (Batting gains a file_row_number column), and each query's result
+    under its own name for the queries after it, so derived tables are
+    built from one shared relation: Polars collects all plans together
+    (common subplans run once) and DuckDB materializes each result as a
+    temporary table. Filters and projections are pushed into the Parquet
+    scans and execution is multi-threaded in both engines.
+    """
+    
+    frames = frames or {}
+    if backend == 'polars':
+        import polars as pl
+        tables = {name.lower(): pl.scan_parquet(path, row_index_name='file_row_number' if name == 'Batting' else None)
+                  for name, path in parquet_paths.items()}
+        tables.update({name: pl.from_pandas(frame).lazy() for name, frame in frames.items()})
+        context = pl.SQLContext(tables)
+        plans = {}
+        for name, sql in queries.items():
+            plans[name] = context.execute(sql, eager=False)
+            context.register(name, plans[name])
+        results = dict(zip(plans, (frame.to_pandas() for frame in pl.collect_all(list(plans.values())))))
+    else:
+        import duckdb
+        con = duckdb.connect()
+        try:
+            for name, path in parquet_paths.items():
+                row_number = ', file_row_number = true' if name == 'Batting' else ''
+                con.execute(f"CREATE VIEW {name.lower()} AS SELECT * FROM read_parquet('{path}'{row_number})")
+            for name, frame in frames.items():
+                con.register(name, frame)
+            results = {}
+            for name, sql in queries.items():
+                # Insertion order is preserved, so a table keeps its query's ORDER BY
+                con.execute(f'CREATE TEMP TABLE "{name}" AS {sql}')
+                results[name] = con.execute(f'SELECT * FROM "{name}"').df()
+        finally:
+            con.close()
+    
+    # Match the pandas path: nullable integers become int64, or float64 when they hold NULLs
+    for result in results.values():
+        for col in result.columns:
+            dtype = result[col].dtype
+            if pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_integer_dtype(dtype):
+                has_nulls = result[col].isna().any()
+                result[col] = result[col].to_numpy('float64' if has_nulls else 'int64', na_value=np.nan)
+    return results
+
+def _lazy_plan_inputs(data_path, backend, columns, metric_weights, refresh_cache):
+    
+    """
+    Fresh Parquet cache paths, the Batting columns to scan (cache order,
+    as load_lahman_data returns them) and any extra frames to register.
+    """
+    
+    if backend not in QUERY_BACKENDS[1:]:
+        raise ValueError(f"Unknown lazy backend: {backend} (expected one of {QUERY_BACKENDS[1:]})")
+    if importlib.util.find_spec(backend) is None:
+        raise ImportError(f"{backend} is not installed (needed for backend='{backend}')")
+    
+    cache_dir = f'{data_path}{CACHE_DIR_NAME}'
+    paths = {}
+    for name in LAHMAN_TABLES:
+        csv_path = f'{data_path}{name}.csv'
+        paths[name] = os.path.join(cache_dir, f'{name}.parquet')
+        if refresh_cache or not (os.path.exists(paths[name])
+                                 and _cache_is_fresh(csv_path, os.path.join(cache_dir, f'{name}.json'))):
+            _read_table_cached(csv_path, cache_dir, refresh_cache=True)
+    
+    with open(os.path.join(cache_dir, 'Batting.json')) as fh:
+        cached_columns = json.load(fh)['columns']
+    batting_columns = [col for col in cached_columns if columns is None or col in columns]
+    
+    frames = {}
+    if metric_weights is not None:
+        # Weights a season doesn't override stay NULL and fall back to the defaults
+        weights = metric_weights.reindex(columns=list(DEFAULT_METRIC_WEIGHTS)).astype('float64')
+        weights.index = weights.index.astype('int64').rename('yearID')
+        frames['weights'] = weights.reset_index()
+    
+    return paths, batting_columns, frames
+
+def preprocess_lazy(data_path='./', backend='polars', min_year=1950, min_ab=100,
+                    columns=BATTING_COLUMNS, metric_weights=None, refresh_cache=False):
+    
+    """
+    preprocess_batting_data as one lazy query plan on Polars or DuckDB.
+    
+    Matches preprocess_batting_data(*load_lahman_data(columns=columns), ...)
+    value for value, with the year/AB filter and column selection pushed
+    into the Parquet scan.
+    """
+    
+    paths, batting_columns, frames = _lazy_plan_inputs(data_path, backend, columns, metric_weights,
+                                                       refresh_cache)
+    sql = _seasons_sql(batting_columns, min_year, min_ab, weighted=metric_weights is not None)
+    return _run_lazy_queries(backend, {'seasons': sql}, paths, frames)['seasons']
+
+def lazy_pipeline_tables(data_path='./', backend='polars', min_year=1950, min_ab=100,
+                         columns=BATTING_COLUMNS, metric_weights=None, refresh_cache=False):
+    
+    """
+    The season table plus league-season aggregates and career table. The
+    seasons relation is built once (one Parquet scan, People join and
+    metric pass) and both aggregates group it inside the engine rather
+    than the collected frame.
+    
+    Equivalent to league_season_aggregates and build_career_table on
+    preprocess_lazy's result; aggregate means match to floating-point
+    rounding, since the engines sum in a different order.
+    
+    Returns {'df', 'league', 'career_table'}.
+    """
+    
+    paths, batting_columns, frames = _lazy_plan_inputs(data_path, backend, columns, metric_weights,
+                                                       refresh_cache)
+    seasons = _seasons_sql(batting_columns, min_year, min_ab, weighted=metric_weights is not None)
+    
+    league_sql = f"""
+        SELECT "yearID", AVG("AVG") AS "AVG", AVG("OBP") AS "OBP", AVG("SLG") AS "SLG",
+               AVG("OPS") AS "OPS", AVG("HR_rate") AS "HR_rate",
+               {', '.join(_sum_sql(col, col) for col in ['HR', 'SO', 'AB'])},
+               COUNT("playerID") AS "playerID"
+        FROM seasons GROUP BY "yearID" ORDER BY "yearID"
+    """
+    sums = ['G', 'AB', 'H', 'HR', 'RBI', 'R', 'BB', 'SO']
+    career_sql = f"""
+        SELECT "playerID", MIN("yearID") AS debut_year, MAX("yearID") AS final_year,
+               COUNT("yearID") AS seasons,
+               {', '.join(_sum_sql(col, f'{col}_sum') for col in sums)},
+               AVG("AVG") AS "AVG_mean", AVG("OPS") AS "OPS_mean", AVG("wOBA") AS "wOBA_mean",
+               MAX("fullName") AS name, AVG("age") AS avg_age,
+               MAX("yearID") - MIN("yearID") + 1 AS career_length
+        FROM seasons GROUP BY "playerID" ORDER BY "playerID"
+    """
+    
+    results = _run_lazy_queries(backend, {'seasons': seasons, 'league': league_sql, 'career': career_sql},
+                                paths, frames)
+    return {
+        'df': results['seasons'],
+        'league': results['league'].set_index('yearID'),
+        'career_table': results['career'].set_index('playerID'),
+    }
+
 # ------------------------------------------------------------------
 # 2️⃣ Historical Trend Analysis
 # ------------------------------------------------------------------
 
-def analyze_historical_trends(df):
+# League-by-year aggregates are memoized per season table: id(df) -> (weakref, version, result)
+_LEAGUE_SEASON_CACHE = {}
+
+def league_season_aggregates(df):
+    
+    """
+    Per-season league aggregates shared by the trend and era-adjustment stages.
+    
+    Computed in one groupby and memoized on the frame's identity and row count,
+    so callers in the same process reuse the same table; the pipeline passes
+    its 'league' stage result to those stages instead, since the memo does not
+    reach pool workers. Call clear_league_season_cache() after editing metric
+    values of a frame in place.
+    """
+    
+    key = id(df)
+    cached = _LEAGUE_SEASON_CACHE.get(key)
+    if cached is not None and cached[0]() is df and cached[1] == len(df):
+        return cached[2]
+    
+    return _remember_league_aggregates(df, _aggregate_league_seasons(df))
+
+def _aggregate_league_seasons(df):
+    
+    return df.groupby('yearID').agg(
+        AVG=('AVG', 'mean'),
+        OBP=('OBP', 'mean'),
+        SLG=('SLG', 'mean'),
+        OPS=('OPS', 'mean'),
+        HR_rate=('HR_rate', 'mean'),
+        HR=('HR', 'sum'),
+        SO=('SO', 'sum'),
+        AB=('AB', 'sum'),
+        playerID=('playerID', 'count')
+    )
+
+def _remember_league_aggregates(df, league):
+    
+    # Drop the entry once the frame is garbage collected so ids cannot be reused stale
+    key = id(df)
+    ref = weakref.ref(df, lambda _, key=key: _LEAGUE_SEASON_CACHE.pop(key, None))
+    _LEAGUE_SEASON_CACHE[key] = (ref, len(df), league)
+    return league
+
+def clear_league_season_cache():
+    _LEAGUE_SEASON_CACHE.clear()
+
+def analyze_historical_trends(df, league=None):
     
-    """Analyze how hitting metrics have changed over time."""
+    """Analyze how hitting metrics have changed over time (league: precomputed league_season_aggregates)."""
     
     print(f"\n{'='*60}")
     print("HISTORICAL TRENDS ANALYSIS")
     print('='*60)
     
-    # Calculate yearly league averages
-    yearly_stats = df.groupby('yearID').agg({
-        'AVG': 'mean',
-        'OBP': 'mean', 
-        'SLG': 'mean',
-        'OPS': 'mean',
-        'HR': 'sum',
-        'SO': 'sum',
-        'AB': 'sum',
-        'playerID': 'count'
-    }).round(3)
+    # Yearly league averages
+    if league is None:
+        league = league_season_aggregates(df)
+    yearly_stats = league[
+        ['AVG', 'OBP', 'SLG', 'OPS', 'HR', 'SO', 'AB', 'playerID']
+    ].round(3)
     
     yearly_stats['HR_per_game'] = yearly_stats['HR'] / (yearly_stats['playerID'] * 162 / 30)  # Approximate
     yearly_stats['K_rate_league'] = yearly_stats['SO'] / yearly_stats['AB']
@@ -220,49 +962,150 @@ def analyze_historical_trends(df):
 # 3️⃣ Player Career Analysis
 # ------------------------------------------------------------------
 
-def analyze_player_careers(df):
-    """Analyze individual player career trajectories."""
+def build_career_table(df):
+    
+    """
+    Build the per-player career table shared by all career-level analyses.
+    
+    One groupby pass over the season table produces every career sum, mean
+    and year bound that analyze_player_careers, predict_hall_of_fame_candidates
+    and custom_player_lookup need; each derives its own extra columns from it.
+    Build it once per pipeline run and pass it to those functions.
+    """
+    
+    career_table = df.groupby('playerID', observed=True).agg(
+        debut_year=('yearID', 'min'),
+        final_year=('yearID', 'max'),
+        seasons=('yearID', 'count'),
+        G_sum=('G', 'sum'),
+        AB_sum=('AB', 'sum'),
+        H_sum=('H', 'sum'),
+        HR_sum=('HR', 'sum'),
+        RBI_sum=('RBI', 'sum'),
+        R_sum=('R', 'sum'),
+        BB_sum=('BB', 'sum'),
+        SO_sum=('SO', 'sum'),
+        AVG_mean=('AVG', 'mean'),
+        OPS_mean=('OPS', 'mean'),
+        wOBA_mean=('wOBA', 'mean'),
+        name=('fullName', 'first'),
+        avg_age=('age', 'mean')
+    )
+    
+    career_table['career_length'] = career_table['final_year'] - career_table['debut_year'] + 1
+    return career_table
+
+# Player-type clustering methods for analyze_player_careers. Ward linkage needs
+# O(n²) memory; the others label any number of careers in bounded memory.
+CLUSTER_METHODS = ('ward', 'minibatch_kmeans', 'birch', 'sampled_ward')
+WARD_MAX_CAREERS = 20_000
+
+def cluster_player_types(X_scaled, method='ward', n_clusters=4, sample_size=5000,
+                         block_size=50_000, random_state=0):
+    
+    """
+    Label standardized career rows with 1-based player-type clusters.
+    
+    - ward: exact Ward linkage over every row
+    - minibatch_kmeans: mini-batch k-means
+    - birch: BIRCH CF-tree with a global clustering step
+    - sampled_ward: Ward linkage on a random sample, then every row is
+      assigned to the nearest sample-cluster centroid in fixed-size blocks
+    """
+    
+    from scipy.cluster.hierarchy import linkage, fcluster
+    from sklearn.cluster import Birch, MiniBatchKMeans
+    
+    if method == 'ward':
+        return fcluster(linkage(X_scaled, method='ward'), n_clusters, criterion='maxclust')
+    
+    if method == 'minibatch_kmeans':
+        model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3,
+                                random_state=random_state)
+        return model.fit_predict(X_scaled) + 1
+    
+    if method == 'birch':
+        return Birch(n_clusters=n_clusters).fit_predict(X_scaled) + 1
+    
+    if method == 'sampled_ward':
+        rng = np.random.default_rng(random_state)
+        sample = X_scaled[rng.choice(len(X_scaled), min(sample_size, len(X_scaled)), replace=False)]
+        sample_labels = fcluster(linkage(sample, method='ward'), n_clusters, criterion='maxclust')
+        
+        cluster_ids = np.unique(sample_labels)
+        centroids = np.vstack([sample[sample_labels == k].mean(axis=0) for k in cluster_ids])
+        
+        labels = np.empty(len(X_scaled), dtype=int)
+        for start in range(0, len(X_scaled), block_size):
+            block = X_scaled[start:start + block_size]
+            distances = ((block[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+            labels[start:start + block_size] = cluster_ids[distances.argmin(axis=1)]
+        return labels
+    
+    raise ValueError(f"Unknown clustering method: {method} (expected one of {CLUSTER_METHODS})")
+
+def _profile_clustering(X_scaled, method, trace_memory=True, **kwargs):
+    """Run cluster_player_types and measure wall time and (optionally) peak traced memory."""
+    
+    if not trace_memory:
+        start = time.perf_counter()
+        labels = cluster_player_types(X_scaled, method, **kwargs)
+        return labels, time.perf_counter() - start, None
+    
+    # Under an outer trace (e.g. benchmark_stages) keep it running and leave
+    # its peak alone; the reported peak is then an upper bound
+    nested = tracemalloc.is_tracing()
+    if not nested:
+        tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        labels = cluster_player_types(X_scaled, method, **kwargs)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not nested:
+            tracemalloc.stop()
+    return labels, elapsed, (peak - base) / 1024**2
+
+def analyze_player_careers(df, career_table=None, min_career_ab=3000, cluster_method='ward',
+                           profile_memory=False):
+    
+    """
+    Analyze individual player career trajectories.
+    
+    Careers with at least min_career_ab at-bats are clustered into player
+    types with cluster_method (see CLUSTER_METHODS). Use one of the
+    bounded-memory methods with a low min_career_ab to label every player.
+    profile_memory=True also reports the clustering's peak traced memory
+    (tracemalloc slows it down).
+    """
+    
+    from sklearn.preprocessing import StandardScaler
     
     print(f"\n{'='*60}")
     print("PLAYER CAREER ANALYSIS")
     print('='*60)
     
-    # Calculate career totals and averages
-    career_stats = df.groupby('playerID').agg({
-        'yearID': ['min', 'max', 'count'],
-        'G': 'sum',
-        'AB': 'sum', 
-        'H': 'sum',
-        'HR': 'sum',
-        'RBI': 'sum',
-        'BB': 'sum',
-        'SO': 'sum',
-        'OPS': 'mean',
-        'wOBA': 'mean',
-        'fullName': 'first',
-        'age': 'mean'
-    }).round(3)
+    if career_table is None:
+        career_table = build_career_table(df)
     
-    # Flatten column names
-    career_stats.columns = ['_'.join(col).strip('_') for col in career_stats.columns]
-    career_stats = career_stats.rename(columns={
-        'yearID_min': 'debut_year',
-        'yearID_max': 'final_year', 
-        'yearID_count': 'seasons',
-        'fullName_first': 'name',
-        'age_mean': 'avg_age'
-    })
+    # Career totals and averages
+    career_stats = career_table[[
+        'debut_year', 'final_year', 'seasons', 'G_sum', 'AB_sum', 'H_sum', 'HR_sum',
+        'RBI_sum', 'BB_sum', 'SO_sum', 'OPS_mean', 'wOBA_mean', 'name', 'avg_age',
+        'career_length'
+    ]].round(3)
     
-    # Calculate career length and rate stats
-    career_stats['career_length'] = career_stats['final_year'] - career_stats['debut_year'] + 1
+    # Calculate rate stats
     career_stats['career_AVG'] = career_stats['H_sum'] / career_stats['AB_sum']
     career_stats['career_HR_rate'] = career_stats['HR_sum'] / career_stats['AB_sum']
     career_stats['career_BB_rate'] = career_stats['BB_sum'] / (career_stats['AB_sum'] + career_stats['BB_sum'])
     
-    # Filter for significant careers (min 3000 AB)
-    significant_careers = career_stats[career_stats['AB_sum'] >= 3000].copy()
+    # Filter for significant careers
+    significant_careers = career_stats[career_stats['AB_sum'] >= min_career_ab].copy()
     
-    print(f"Players with 3000+ career AB: {len(significant_careers)}")
+    print(f"Players with {min_career_ab}+ career AB: {len(significant_careers)}")
     
     # Identify different player types using clustering
     features = ['career_AVG', 'career_HR_rate', 'career_BB_rate', 'OPS_mean']
@@ -272,16 +1115,17 @@ def analyze_player_careers(df):
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
-    # Hierarchical clustering
-    linkage_matrix = linkage(X_scaled, method='ward')
-    clusters = fcluster(linkage_matrix, 4, criterion='maxclust')
+    # Player-type clustering
+    clusters, elapsed, peak_mb = _profile_clustering(X_scaled, cluster_method, trace_memory=profile_memory)
+    print(f"Clustering ({cluster_method}): {len(X)} careers in {elapsed:.2f}s"
+          + (f", peak {peak_mb:.1f} MB" if peak_mb is not None else ''))
     
     significant_careers.loc[X.index, 'player_type'] = clusters
     
     # Define player types
     cluster_names = {1: 'Contact Hitters', 2: 'Power Hitters', 3: 'Balanced', 4: 'Patient Hitters'}
     
-    print("\nPlayer Type Analysis (Career 3000+ AB):")
+    print(f"\nPlayer Type Analysis (Career {min_career_ab}+ AB):")
     print("-" * 45)
     for cluster_id in sorted(significant_careers['player_type'].unique()):
         if pd.isna(cluster_id):
@@ -300,60 +1144,534 @@ def analyze_player_careers(df):
     
     return significant_careers
 
-# ------------------------------------------------------------------
-# 4️⃣ Era-Adjusted Performance Analysis
-# ------------------------------------------------------------------
+def compare_clustering_methods(df, career_table=None, min_career_ab=0, methods=CLUSTER_METHODS):
+    
+    """
+    Time each clustering method on the same standardized career matrix and
+    report runtime, peak traced memory and cluster sizes. Ward is skipped
+    above WARD_MAX_CAREERS rows, where its distance matrix would not fit.
+    """
+    
+    from sklearn.preprocessing import StandardScaler
+    
+    if career_table is None:
+        career_table = build_career_table(df)
+    
+    careers = career_table[career_table['AB_sum'] >= min_career_ab]
+    X = pd.DataFrame({
+        'career_AVG': careers['H_sum'] / careers['AB_sum'],
+        'career_HR_rate': careers['HR_sum'] / careers['AB_sum'],
+        'career_BB_rate': careers['BB_sum'] / (careers['AB_sum'] + careers['BB_sum']),
+        'OPS_mean': careers['OPS_mean']
+    }).dropna()
+    X_scaled = StandardScaler().fit_transform(X)
+    
+    print(f"\nClustering methods on {len(X)} careers ({min_career_ab}+ AB):")
+    print(f"{'Method':18s} {'Time (s)':>9s} {'Peak MB':>9s}  Cluster sizes")
+    print("-" * 60)
+    
+    report = {}
+    for method in methods:
+        if method == 'ward' and len(X) > WARD_MAX_CAREERS:
+            print(f"{method:18s} {'skipped':>9s} {'':>9s}  (> {WARD_MAX_CAREERS} careers)")
+            continue
+        labels, elapsed, peak_mb = _profile_clustering(X_scaled, method)
+        sizes = np.bincount(labels)[1:]
+        report[method] = {'seconds': elapsed, 'peak_mb': peak_mb, 'sizes': sizes.tolist()}
+        print(f"{method:18s} {elapsed:9.3f} {peak_mb:9.1f}  {sizes.tolist()}")
+    
+    return report
 
-def calculate_era_adjustments(df):
-    """Calculate era-adjusted statistics to compare players across different periods."""
+# Player comparables: careers as standardized feature vectors, nearest
+# neighbours by Euclidean distance
+COMPARABLE_FEATURES = ['career_AVG', 'career_HR_rate', 'career_BB_rate', 'career_K_rate',
+                       'OPS_mean', 'wOBA_mean', 'seasons', 'AB_sum']
+
+def comparables_index(career_table, min_career_ab=1000):
     
-    print(f"\n{'='*60}")
-    print("ERA-ADJUSTED PERFORMANCE ANALYSIS")
-    print('='*60)
+    """
+    Precompute the standardized career-feature matrix for similar_players.
     
-    # Calculate league averages by year
-    league_avg = df.groupby('yearID').agg({
-        'AVG': 'mean',
-        'OBP': 'mean',
-        'SLG': 'mean', 
-        'OPS': 'mean'
-    }).add_suffix('_lg')
+    Careers with at least min_career_ab at-bats are z-scored per feature
+    (population std, as StandardScaler). Returns a dict with players,
+    names, raw features, the standardized matrix and its squared row norms.
+    """
+    
+    careers = career_table[career_table['AB_sum'] >= min_career_ab]
+    raw = pd.DataFrame({
+        'career_AVG': careers['H_sum'] / careers['AB_sum'],
+        'career_HR_rate': careers['HR_sum'] / careers['AB_sum'],
+        'career_BB_rate': careers['BB_sum'] / (careers['AB_sum'] + careers['BB_sum']),
+        'career_K_rate': careers['SO_sum'] / (careers['AB_sum'] + careers['BB_sum']),
+        'OPS_mean': careers['OPS_mean'],
+        'wOBA_mean': careers['wOBA_mean'],
+        'seasons': careers['seasons'],
+        'AB_sum': careers['AB_sum'],
+    }, index=careers.index)[COMPARABLE_FEATURES].astype('float64').dropna()
+    
+    values = raw.to_numpy()
+    mean = values.mean(axis=0) if len(values) else np.zeros(len(COMPARABLE_FEATURES))
+    scale = values.std(axis=0) if len(values) else np.ones(len(COMPARABLE_FEATURES))
+    scale[scale == 0] = 1.0
+    matrix = np.ascontiguousarray((values - mean) / scale)
+    
+    return {
+        'players': raw.index, 'names': careers.loc[raw.index, 'name'].to_numpy(), 'raw': raw,
+        'matrix': matrix, 'sq_norms': np.einsum('ij,ij->i', matrix, matrix),
+        'mean': mean, 'scale': scale,
+    }
+
+def _nearest_block(index, rows, k):
     
-    # Merge league averages
-    df_era = df.merge(league_avg, left_on='yearID', right_index=True, how='left')
+    """
+    The k nearest other careers to each of rows (positions in the index)
+    by brute force: squared distances as |a|^2 + |b|^2 - 2ab from one
+    matrix product, argpartition for the k smallest, then a sort of just
+    those k. Needs only NumPy, so single lookups stay import-light.
+    """
     
-    # Calculate era-adjusted stats (player stat / league average * 100)
-    df_era['AVG_plus'] = (df_era['AVG'] / df_era['AVG_lg'] * 100).round(1)
-    df_era['OBP_plus'] = (df_era['OBP'] / df_era['OBP_lg'] * 100).round(1)
-    df_era['SLG_plus'] = (df_era['SLG'] / df_era['SLG_lg'] * 100).round(1)
-    df_era['OPS_plus'] = (df_era['OPS'] / df_era['OPS_lg'] * 100).round(1)
+    matrix, sq_norms = index['matrix'], index['sq_norms']
+    
+    # |a|^2 is constant along a row, so rank on |b|^2 - 2ab (built in place)
+    # and add it only to the k survivors
+    scores = matrix[rows] @ matrix.T
+    scores *= -2
+    scores += sq_norms
+    scores[np.arange(len(rows)), rows] = np.inf
+    
+    nearest = np.argpartition(scores, k - 1, axis=1)[:, :k]
+    nearest_scores = np.take_along_axis(scores, nearest, axis=1)
+    order = np.argsort(nearest_scores, axis=1, kind='stable')
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    distances = np.take_along_axis(nearest_scores, order, axis=1) + sq_norms[rows, None]
+    return nearest, np.sqrt(np.maximum(distances, 0))
+
+def similar_players(player_id, k=10, index=None, career_table=None):
     
-    # Identify extreme performances
-    print("Most Dominant Single Seasons (OPS+):")
-    print("-" * 40)
+    """
+    The k careers most similar to player_id, nearest first.
     
-    # Filter for minimum plate appearances
-    qualified = df_era[df_era['AB'] >= 400].copy()
-    top_seasons = qualified.nlargest(10, 'OPS_plus')
+    Uses index (from comparables_index) or builds one from career_table.
+    Returns name, distance (in standard deviations) and the raw career
+    features, indexed by playerID. Raises KeyError for a player outside
+    the index.
+    """
     
-    for idx, season in top_seasons.iterrows():
-        print(f"{season.get('fullName', season['playerID']):25s} {season['yearID']} - "
-              f"OPS+: {season['OPS_plus']:5.1f} (OPS: {season['OPS']:.3f})")
+    if index is None:
+        if career_table is None:
+            raise ValueError("similar_players needs an index or a career_table")
+        index = comparables_index(career_table)
     
-    return df_era
+    row = index['players'].get_indexer([player_id])[0]
+    if row < 0:
+        raise KeyError(player_id)
+    
+    k = min(k, len(index['players']) - 1)
+    if k > 0:
+        nearest, distances = _nearest_block(index, np.array([row]), k)
+    else:
+        nearest, distances = np.empty((1, 0), dtype=np.int64), np.empty((1, 0))
+    
+    comparables = index['raw'].iloc[nearest[0]]
+    return comparables.assign(name=index['names'][nearest[0]], distance=distances[0])[
+        ['name', 'distance'] + COMPARABLE_FEATURES]
+
+def all_comparables(index, k=10, cache_dir=None):
+    
+    """
+    Top-k comparables for every player in the index at once.
+    
+    All careers query one KD-tree over the standardized matrix (exact
+    neighbours in roughly n log n, using every core), instead of n brute
+    force scans. With cache_dir the result is pickled under a key built
+    from the feature matrix and k, and a later call on the same careers
+    loads it.
+    
+    Returns a long frame: playerID, rank (1 = nearest), comparable, distance.
+    """
+    
+    from scipy.spatial import cKDTree
+    
+    n = len(index['players'])
+    if n < 2:
+        # No player has a comparable
+        return pd.DataFrame(columns=['playerID', 'rank', 'comparable', 'distance'])
+    k = min(k, n - 1)
+    
+    cache_path = None
+    if cache_dir:
+        key = hashlib.sha256(json.dumps([_frame_fingerprint(index['raw']), k, COMPARABLE_FEATURES])
+                             .encode()).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f'comparables-{key}.pkl')
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as fh:
+                return pickle.load(fh)
+    
+    if k > 0:
+        distances, nearest = cKDTree(index['matrix']).query(index['matrix'], k + 1, workers=-1)
+        # Each career finds itself at distance 0; where exact duplicates crowd
+        # it out of the k + 1, the farthest match is dropped instead
+        is_self = nearest == np.arange(n)[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        nearest, distances = nearest[~is_self].reshape(n, k), distances[~is_self].reshape(n, k)
+    else:
+        nearest, distances = np.empty((n, 0), dtype=np.int64), np.empty((n, 0))
+    
+    players = index['players'].to_numpy()
+    result = pd.DataFrame({
+        'playerID': np.repeat(players, k),
+        'rank': np.tile(np.arange(1, k + 1), n),
+        'comparable': players[nearest.ravel()],
+        'distance': distances.ravel(),
+    })
+    
+    if cache_path:
+        _write_pickle_atomic(result, cache_path)
+    return result
 
 # ------------------------------------------------------------------
-# 5️⃣ Statistical Analysis Functions
+# 4️⃣ Era-Adjusted Performance Analysis
 # ------------------------------------------------------------------
 
-def perform_statistical_tests(df):
-    """Perform various statistical tests on baseball data."""
+def era_adjusted_columns(df, league):
     
-    print(f"\n{'='*60}")
-    print("STATISTICAL HYPOTHESIS TESTING")
-    print('='*60)
+    """
+    League averages by year and the era-adjusted *_plus stats for each row.
     
-    # Test 1: Has offensive performance changed significantly over time?
+    League values are broadcast onto each player-season by year position
+    instead of merging a full copy of df.
+    """
+    
+    league_avg = league[['AVG', 'OBP', 'SLG', 'OPS']]
+    year_pos = league_avg.index.get_indexer(df['yearID'])
+    
+    df_era = df[['playerID', 'yearID']].copy()
+    for stat in ['AVG', 'OBP', 'SLG', 'OPS']:
+        league_values = league_avg[stat].to_numpy()[year_pos]
+        df_era[f'{stat}_lg'] = league_values
+        # Era-adjusted stat (player stat / league average * 100)
+        df_era[f'{stat}_plus'] = np.round(df[stat].to_numpy() / league_values * 100, 1)
+    
+    return df_era
+
+def calculate_era_adjustments(df, league=None):
+    
+    """
+    Calculate era-adjusted statistics to compare players across different periods.
+    
+    league is a precomputed league_season_aggregates(df), computed here if
+    not given. Returns the *_lg and *_plus columns (with playerID/yearID)
+    aligned to df's index; use df.join(...) when the full row is needed.
+    """
+    
+    print(f"\n{'='*60}")
+    print("ERA-ADJUSTED PERFORMANCE ANALYSIS")
+    print('='*60)
+    
+    if league is None:
+        league = league_season_aggregates(df)
+    df_era = era_adjusted_columns(df, league)
+    
+    # Identify extreme performances
+    print("Most Dominant Single Seasons (OPS+):")
+    print("-" * 40)
+    
+    # Filter for minimum plate appearances
+    qualified = df_era[(df['AB'] >= 400).to_numpy()]
+    top_seasons = df.loc[qualified.nlargest(10, 'OPS_plus').index]
+    
+    for idx, season in top_seasons.iterrows():
+        print(f"{season.get('fullName', season['playerID']):25s} {season['yearID']} - "
+              f"OPS+: {df_era.at[idx, 'OPS_plus']:5.1f} (OPS: {season['OPS']:.3f})")
+    
+    return df_era
+
+# ------------------------------------------------------------------
+# 5️⃣ Statistical Analysis Functions
+# ------------------------------------------------------------------
+
+# Upper bound on elements in one resample index matrix (~32 MB of int64)
+RESAMPLE_CHUNK_ELEMENTS = 4_000_000
+RESAMPLING_TESTS = ['pearson', 't_test', 'mann_whitney', 'poisson_ks']
+
+def _rowwise_pearson(x, y):
+    """Pearson r of each row of x against the same row of y."""
+    xm = x - x.mean(axis=1, keepdims=True)
+    ym = y - y.mean(axis=1, keepdims=True)
+    return (xm * ym).sum(axis=1) / np.sqrt((xm ** 2).sum(axis=1) * (ym ** 2).sum(axis=1))
+
+def _rowwise_mann_whitney_u(a, b):
+    """Mann-Whitney U of each row of a against the same row of b."""
+    
+    from scipy import stats
+    ranks = stats.rankdata(np.hstack([a, b]), axis=1)
+    n_a = a.shape[1]
+    return ranks[:, :n_a].sum(axis=1) - n_a * (n_a + 1) / 2
+
+def _rowwise_counts(idx, n):
+    """Multiplicity of each of range(n) in every row of idx, by one offset bincount."""
+    offsets = np.arange(len(idx))[:, None] * n
+    return np.bincount((idx + offsets).ravel(), minlength=len(idx) * n).reshape(len(idx), n)
+
+def _bootstrap_pearson(x, y, size, rng):
+    
+    """
+    Pearson r of `size` paired bootstrap resamples. Each resample is
+    reduced to multiplicity counts, and its sums of x, y, x², y² and xy
+    (of the centred data) come from one counts x features product.
+    """
+    
+    n = len(x)
+    xc, yc = x - x.mean(), y - y.mean()
+    counts = _rowwise_counts(rng.integers(0, n, (size, n)), n)
+    sx, sy, sxx, syy, sxy = (counts @ np.column_stack([xc, yc, xc * xc, yc * yc, xc * yc])).T
+    return (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+
+def _random_subset_sums(values, k, size, rng):
+    
+    """
+    Sums of `size` uniformly random k-subsets of values. The subset is the
+    k smallest of fresh random keys (argpartition), which is cheaper than
+    shuffling every row; the smaller of the subset and its complement is
+    gathered.
+    """
+    
+    m = min(k, len(values) - k)
+    if m == 0:
+        return np.full(size, values.sum() if k else 0.0)
+    picked = np.argpartition(rng.random((size, len(values))), m - 1, axis=1)[:, :m]
+    sums = values[picked].sum(axis=1)
+    return sums if m == k else values.sum() - sums
+
+def _bootstrap_mann_whitney_u(a, b, size, rng):
+    """
+    Mann-Whitney U of `size` bootstrap resamples of a and b without
+    re-ranking. b is sorted and each a value placed among it once; a
+    resample is then only multiplicity counts, and U is the sum over a of
+    count x (resampled b values below it + half of those tied with it).
+    """
+    
+    b_sorted = np.sort(b)
+    below = np.searchsorted(b_sorted, a, side='left')
+    not_above = np.searchsorted(b_sorted, a, side='right')
+    
+    count_a = _rowwise_counts(rng.integers(0, len(a), (size, len(a))), len(a))
+    count_b = _rowwise_counts(rng.integers(0, len(b), (size, len(b))), len(b))
+    cum_b = np.zeros((size, len(b) + 1), dtype=np.int32)
+    np.cumsum(count_b, axis=1, out=cum_b[:, 1:])
+    
+    # Twice U in exact integers: below + not_above counts every tie once
+    return np.einsum('ij,ij->i', count_a, cum_b[:, below] + cum_b[:, not_above]) / 2
+
+def _rowwise_poisson_ks(samples):
+    """
+    KS statistic of each row against a Poisson fitted to that row; equals
+    stats.kstest(row, poisson(row.mean()).cdf) for integer data.
+    """
+    return _poisson_ks_from_counts(_rowwise_counts(samples, samples.max() + 1))
+
+def _poisson_ks_from_counts(counts):
+    
+    """
+    _rowwise_poisson_ks from each row's value counts (column v counts the
+    value v), so the cost depends on the support rather than the sample size.
+    """
+    
+    from scipy import stats
+    
+    values = np.arange(counts.shape[1])
+    n = counts[0].sum()
+    
+    ecdf = np.cumsum(counts, axis=1) / n
+    ecdf_below = ecdf - counts / n
+    cdf = stats.poisson.cdf(values[None, :], (counts @ values / n)[:, None])
+    gaps = np.maximum(ecdf - cdf, cdf - ecdf_below)
+    return np.where(counts > 0, gaps, 0).max(axis=1)
+
+def _bootstrap_chunk(test, arrays, size, seed):
+    
+    """
+    Estimates for `size` bootstrap resamples, drawn as one index matrix per
+    sample; for the Poisson mean, as multinomial counts of the distinct
+    values, which is the same resampling distribution at O(distinct values).
+    """
+    
+    rng = np.random.default_rng(seed)
+    draw = lambda values: values[rng.integers(0, len(values), (size, len(values)))]
+    
+    if test == 'pearson':
+        return _bootstrap_pearson(*arrays, size, rng)
+    if test == 't_test':
+        a, b = arrays
+        return draw(a).mean(axis=1) - draw(b).mean(axis=1)
+    if test == 'mann_whitney':
+        a, b = arrays
+        return _bootstrap_mann_whitney_u(a, b, size, rng) / (len(a) * len(b))
+    if test == 'poisson_ks':
+        values, freq = np.unique(arrays[0], return_counts=True)
+        return rng.multinomial(len(arrays[0]), freq / len(arrays[0]), size=size) @ values / len(arrays[0])
+    raise ValueError(f"Unknown test: {test}")
+
+def _null_chunk(test, arrays, size, seed):
+    
+    """
+    Test statistics under the null: label permutations for the two-sample
+    tests and the correlation, a parametric Poisson bootstrap for the KS fit.
+    
+    Permuting y leaves its mean and spread unchanged, so the correlation
+    null needs only one product with the centred x per row; a relabelling
+    only picks which pooled values are group a, so the two-sample tests
+    need only random subset sums; and the KS statistic depends only on
+    value counts, so Poisson samples are drawn directly as multinomial
+    counts over the support.
+    """
+    
+    from scipy import stats
+    
+    rng = np.random.default_rng(seed)
+    
+    if test == 'pearson':
+        x, y = arrays
+        xc, yc = x - x.mean(), y - y.mean()
+        shuffled = rng.permuted(np.tile(yc, (size, 1)), axis=1)
+        return shuffled @ xc / np.sqrt((xc ** 2).sum() * (yc ** 2).sum())
+    if test in ('t_test', 'mann_whitney'):
+        a, b = arrays
+        pooled = np.concatenate([a, b])
+        if test == 'mann_whitney':
+            # Ranks of the pooled sample do not change under relabelling
+            pooled = stats.rankdata(pooled)
+        sum_a = _random_subset_sums(pooled, len(a), size, rng)
+        if test == 't_test':
+            return sum_a / len(a) - (pooled.sum() - sum_a) / len(b)
+        return sum_a - len(a) * (len(a) + 1) / 2
+    if test == 'poisson_ks':
+        (hr,) = arrays
+        lam = hr.mean()
+        # Values past the 1 - 1e-12 quantile are folded into the last bucket
+        support = int(stats.poisson.isf(1e-12, lam)) + 2
+        pmf = stats.poisson.pmf(np.arange(support), lam)
+        pmf[-1] += stats.poisson.sf(support - 1, lam)
+        return _poisson_ks_from_counts(rng.multinomial(len(hr), pmf, size=size))
+    raise ValueError(f"Unknown test: {test}")
+
+def _resample(func, test, arrays, n_resamples, seed_seq, executor):
+    
+    """
+    Run n_resamples through func in chunks of at most RESAMPLE_CHUNK_ELEMENTS
+    index entries, each chunk with its own SeedSequence child so the result
+    does not depend on the number of workers.
+    """
+    
+    rows = max(1, RESAMPLE_CHUNK_ELEMENTS // sum(len(a) for a in arrays))
+    sizes = [min(rows, n_resamples - start) for start in range(0, n_resamples, rows)]
+    seeds = seed_seq.spawn(len(sizes))
+    
+    if executor is None:
+        parts = [func(test, arrays, size, seq) for size, seq in zip(sizes, seeds)]
+    else:
+        parts = list(executor.map(func, [test] * len(sizes), [arrays] * len(sizes), sizes, seeds))
+    return np.concatenate(parts)
+
+def _resampling_samples(df):
+    """The samples behind each test in perform_statistical_tests."""
+    
+    samples = {}
+    
+    modern = df.loc[df['yearID'] >= 2000, ['yearID', 'OPS']].dropna()
+    if len(modern) > 2:
+        samples['pearson'] = (modern['yearID'].to_numpy(float), modern['OPS'].to_numpy(float))
+    
+    for test, col, (left, right) in [('t_test', 'bats', ('L', 'R')),
+                                     ('mann_whitney', 'lgID', ('AL', 'NL'))]:
+        if col in df.columns:
+            a = df.loc[df[col] == left, 'OPS'].dropna().to_numpy(float)
+            b = df.loc[df[col] == right, 'OPS'].dropna().to_numpy(float)
+            if len(a) > 0 and len(b) > 0:
+                samples[test] = (a, b)
+    
+    samples['poisson_ks'] = (df['HR'].dropna().to_numpy(np.int64),)
+    return samples
+
+def resampling_inference(df, n_resamples=10_000, workers=None, seed=0, alpha=0.05):
+    
+    """
+    Bootstrap confidence intervals and resampling p-values for each test
+    in perform_statistical_tests.
+    
+    - pearson: r, paired bootstrap CI, permutation p (shuffled OPS)
+    - t_test: L-R mean OPS difference, bootstrap CI, permutation p
+    - mann_whitney: AL>NL probability U/(n1*n2), bootstrap CI, permutation p on U
+    - poisson_ks: lambda with bootstrap CI, parametric-bootstrap p of the KS fit
+    
+    Resamples are drawn in memory-bounded chunks, as NumPy index matrices
+    or, where a statistic only needs them, as value counts; chunks are
+    spread over a process pool when workers > 1 and seeded from
+    SeedSequence(seed), so results are reproducible for any worker count.
+    """
+    
+    samples = _resampling_samples(df)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    rows = []
+    try:
+        for test_idx, test in enumerate(RESAMPLING_TESTS):
+            if test not in samples:
+                continue
+            arrays = samples[test]
+            
+            if test == 'pearson':
+                estimate = observed = _rowwise_pearson(arrays[0][None, :], arrays[1][None, :])[0]
+            elif test == 't_test':
+                estimate = observed = arrays[0].mean() - arrays[1].mean()
+            elif test == 'mann_whitney':
+                observed = _rowwise_mann_whitney_u(arrays[0][None, :], arrays[1][None, :])[0]
+                estimate = observed / (len(arrays[0]) * len(arrays[1]))
+            else:
+                estimate = arrays[0].mean()
+                observed = _rowwise_poisson_ks(arrays[0][None, :])[0]
+            
+            boot = _resample(_bootstrap_chunk, test, arrays, n_resamples,
+                             np.random.SeedSequence(seed, spawn_key=(test_idx, 0)), executor)
+            null = _resample(_null_chunk, test, arrays, n_resamples,
+                             np.random.SeedSequence(seed, spawn_key=(test_idx, 1)), executor)
+            
+            if test == 'mann_whitney':
+                center = len(arrays[0]) * len(arrays[1]) / 2
+                extreme = np.abs(null - center) >= abs(observed - center)
+            elif test == 'poisson_ks':
+                extreme = null >= observed
+            else:
+                extreme = np.abs(null) >= abs(observed)
+            
+            low, high = np.quantile(boot, [alpha / 2, 1 - alpha / 2])
+            rows.append({'test': test, 'estimate': estimate, 'ci_low': low, 'ci_high': high,
+                         'p_value': (extreme.sum() + 1) / (n_resamples + 1)})
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return pd.DataFrame(rows).set_index('test')
+
+def perform_statistical_tests(df, n_resamples=0, workers=None, seed=0):
+    
+    """
+    Perform various statistical tests on baseball data.
+    
+    With n_resamples > 0, bootstrap confidence intervals and permutation
+    (or parametric-bootstrap) p-values from resampling_inference are
+    reported after the classical tests and returned.
+    """
+    
+    from scipy import stats
+    
+    print(f"\n{'='*60}")
+    print("STATISTICAL HYPOTHESIS TESTING")
+    print('='*60)
+    
+    # Test 1: Has offensive performance changed significantly over time?
     modern_data = df[df['yearID'] >= 2000].copy()
     
     if len(modern_data) > 0:
@@ -401,41 +1719,179 @@ def perform_statistical_tests(df):
     print(f"Mean HR per season: {lambda_param:.2f}")
     print(f"Poisson fit - KS statistic: {ks_stat:.4f}, p-value: {ks_p:.6f}")
     print(f"Follows Poisson distribution: {'Yes' if ks_p > 0.05 else 'No'}")
+    
+    if n_resamples <= 0:
+        return None
+    
+    inference = resampling_inference(df, n_resamples, workers, seed)
+    labels = {'pearson': 'Year~OPS r', 't_test': 'L-R OPS diff',
+              'mann_whitney': 'P(AL > NL)', 'poisson_ks': 'HR lambda'}
+    
+    print(f"\nResampling Inference ({n_resamples:,} resamples, seed {seed}):")
+    print(f"{'Estimate':14s} {'Value':>8s} {'95% CI':>20s} {'p-value':>9s}")
+    print("-" * 54)
+    for test, row in inference.iterrows():
+        ci = f"[{row['ci_low']:.4f}, {row['ci_high']:.4f}]"
+        print(f"{labels[test]:14s} {row['estimate']:8.4f} {ci:>20s} {row['p_value']:9.4f}")
+    
+    return inference
 
 # ------------------------------------------------------------------
 # 6️⃣ Performance Prediction and Classification
 # ------------------------------------------------------------------
 
-def predict_hall_of_fame_candidates(df):
-    """Use machine learning to identify potential Hall of Fame players."""
+# Trained Hall of Fame model: career-table features, labels from the
+# HallOfFame table, persisted under the cache dir by feature-schema hash
+HOF_FEATURES = ['G_sum', 'AB_sum', 'H_sum', 'HR_sum', 'RBI_sum', 'R_sum', 'BB_sum', 'SO_sum',
+                'AVG_mean', 'OPS_mean', 'wOBA_mean', 'seasons', 'career_length',
+                'career_avg', 'hr_per_season']
+HOF_MODEL_PARAMS = {'n_estimators': 300, 'min_samples_leaf': 2,
+                    'class_weight': 'balanced_subsample', 'random_state': 0}
+
+def load_hall_of_fame(data_path='./', use_cache=True):
+    """HallOfFame table (through the Parquet cache when pyarrow is available), or None if missing."""
+    
+    csv_path = f'{data_path}HallOfFame.csv'
+    if not os.path.exists(csv_path):
+        return None
+    if use_cache and importlib.util.find_spec('pyarrow') is not None:
+        return _read_table_cached(csv_path, f'{data_path}{CACHE_DIR_NAME}')[0]
+    return pd.read_csv(csv_path)
+
+def hof_features(career_table):
+    """Model inputs for every player in the career table, in HOF_FEATURES order."""
+    
+    features = career_table.assign(
+        career_avg=career_table['H_sum'] / career_table['AB_sum'],
+        hr_per_season=career_table['HR_sum'] / career_table['seasons'],
+    )
+    return features[HOF_FEATURES].astype('float64').fillna(0)
+
+def hof_training_set(career_table, hall_of_fame):
+    
+    """
+    Features and labels for players with a ballot outcome: 1 if ever
+    inducted as a player, 0 if they only appeared on the ballot.
+    """
+    
+    ballots = hall_of_fame
+    if 'category' in ballots.columns:
+        ballots = ballots[ballots['category'] == 'Player']
+    labels = (ballots['inducted'] == 'Y').groupby(ballots['playerID']).any()
+    labels = labels[labels.index.isin(career_table.index)]
+    
+    return hof_features(career_table.loc[labels.index]), labels.astype(np.int8)
+
+def _hof_schema_hash():
+    import sklearn
+    payload = json.dumps([HOF_FEATURES, HOF_MODEL_PARAMS, sklearn.__version__])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def train_hof_model(features, labels, n_jobs=-1):
+    
+    """
+    Fit the random forest with trees built in parallel (n_jobs=-1 uses
+    every core). The out-of-bag AUC stands in for a held-out score
+    without a second fit.
+    
+    Returns the model bundle: model, schema_hash, features, n_players,
+    n_inducted and oob_auc.
+    """
+    
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import roc_auc_score
+    
+    if labels.nunique() < 2:
+        raise ValueError("HOF training set needs both inducted and non-inducted players")
+    
+    model = RandomForestClassifier(oob_score=True, n_jobs=n_jobs, **HOF_MODEL_PARAMS)
+    model.fit(features.to_numpy(), labels.to_numpy())
+    
+    oob = model.oob_decision_function_[:, 1]
+    scored = ~np.isnan(oob)
+    return {
+        'model': model, 'schema_hash': _hof_schema_hash(), 'features': list(HOF_FEATURES),
+        'n_players': len(labels), 'n_inducted': int(labels.sum()),
+        'oob_auc': roc_auc_score(labels[scored], oob[scored]) if labels[scored].nunique() == 2 else np.nan,
+    }
+
+def load_hof_model(career_table, hall_of_fame, model_dir, refit=False, n_jobs=-1):
+    
+    """
+    The persisted HOF model for the current feature schema, trained and
+    saved on first use.
+    
+    The file is named by the schema hash (features, hyperparameters and
+    scikit-learn version), so a schema change never loads an incompatible
+    model. It is also refit when the training players or labels change,
+    or with refit.
+    
+    Returns (bundle, loaded_from_disk).
+    """
+    
+    features, labels = hof_training_set(career_table, hall_of_fame)
+    data_hash = _frame_fingerprint(features.assign(label=labels))
+    path = os.path.join(model_dir, f'hof_model-{_hof_schema_hash()}.pkl')
+    
+    if not refit and os.path.exists(path):
+        with open(path, 'rb') as fh:
+            bundle = pickle.load(fh)
+        if bundle.get('data_hash') == data_hash:
+            return bundle, True
+    
+    bundle = {**train_hof_model(features, labels, n_jobs), 'data_hash': data_hash}
+    _write_pickle_atomic(bundle, path)
+    return bundle, False
+
+def score_hof_candidates(bundle, career_table, players=None):
+    
+    """
+    Induction probability for many players in one predict_proba call.
+    
+    players defaults to every active player (final_year equal to the last
+    season in the table). Returns name, career totals and hof_probability,
+    highest first.
+    """
+    
+    if players is None:
+        players = career_table.index[career_table['final_year'] == career_table['final_year'].max()]
+    
+    candidates = career_table.loc[players]
+    features = hof_features(candidates)[bundle['features']]
+    probability = bundle['model'].predict_proba(features.to_numpy())[:, 1]
+    
+    columns = ['name', 'seasons', 'H_sum', 'HR_sum', 'OPS_mean']
+    return candidates[columns].assign(hof_probability=probability).sort_values(
+        'hof_probability', ascending=False)
+
+def predict_hall_of_fame_candidates(df, career_table=None, hall_of_fame=None, model_dir=None):
+    
+    """
+    Use machine learning to identify potential Hall of Fame players.
+    
+    The milestone point score is always shown. With a HallOfFame table,
+    the trained model (loaded from model_dir when already persisted)
+    also scores every player, and active players are ranked by
+    induction probability.
+    """
     
     print(f"\n{'='*60}")
     print("HALL OF FAME PREDICTION MODEL")
     print('='*60)
     
-    # Calculate career statistics for each player
-    career_totals = df.groupby('playerID').agg({
-        'G': 'sum',
-        'AB': 'sum',
-        'H': 'sum', 
-        'HR': 'sum',
-        'RBI': 'sum',
-        'R': 'sum',
-        'BB': 'sum',
-        'OPS': 'mean',
-        'wOBA': 'mean',
-        'yearID': ['min', 'max', 'count'],
-        'fullName': 'first'
-    })
+    if career_table is None:
+        career_table = build_career_table(df)
     
-    # Flatten columns
-    career_totals.columns = ['_'.join(col).strip('_') for col in career_totals.columns]
-    career_totals = career_totals.rename(columns={'fullName_first': 'name'})
+    # Career statistics for each player
+    career_totals = career_table[[
+        'G_sum', 'AB_sum', 'H_sum', 'HR_sum', 'RBI_sum', 'R_sum', 'BB_sum',
+        'OPS_mean', 'wOBA_mean', 'debut_year', 'final_year', 'seasons', 'name',
+        'career_length'
+    ]].copy()
     
     # Calculate additional metrics
-    career_totals['career_length'] = (career_totals['yearID_max'] - career_totals['yearID_min'] + 1)
     career_totals['career_avg'] = career_totals['H_sum'] / career_totals['AB_sum']
-    career_totals['hr_per_season'] = career_totals['HR_sum'] / career_totals['yearID_count']
+    career_totals['hr_per_season'] = career_totals['HR_sum'] / career_totals['seasons']
     
     # Create Hall of Fame likelihood score based on traditional benchmarks
     hof_score = 0
@@ -450,7 +1906,7 @@ def predict_hall_of_fame_candidates(df):
         (career_totals['OPS_mean'] >= 0.900, 25),   # .900 OPS
         (career_totals['career_avg'] >= 0.320, 15), # .320 average
         (career_totals['career_length'] >= 15, 10), # Longevity
-        (career_totals['yearID_count'] >= 12, 10)   # Seasons played
+        (career_totals['seasons'] >= 12, 10)        # Seasons played
     ]
     
     for condition, points in conditions:
@@ -478,7 +1934,33 @@ def predict_hall_of_fame_candidates(df):
               f"{player['HR_sum']:4.0f} "
               f"{player['H_sum']:5.0f} "
               f"{player['OPS_mean']:5.3f} "
-              f"{player['yearID_count']:5.0f}")
+              f"{player['seasons']:5.0f}")
+    
+    if hall_of_fame is None:
+        return career_totals
+    
+    try:
+        if model_dir is None:
+            bundle, loaded = train_hof_model(*hof_training_set(career_table, hall_of_fame)), False
+        else:
+            bundle, loaded = load_hof_model(career_table, hall_of_fame, model_dir)
+    except ValueError as e:
+        print(f"\nHOF model not trained: {e}")
+        return career_totals
+    
+    print(f"\nTrained HOF Model ({'loaded' if loaded else 'fitted'}, schema {bundle['schema_hash']}):")
+    print(f"Ballot players: {bundle['n_players']:,} ({bundle['n_inducted']} inducted), "
+          f"out-of-bag AUC: {bundle['oob_auc']:.3f}")
+    
+    scores = score_hof_candidates(bundle, career_table, players=career_table.index)
+    career_totals['hof_probability'] = scores['hof_probability']
+    
+    active = career_table.index[career_table['final_year'] == career_table['final_year'].max()]
+    print(f"\nActive Players by Induction Probability:")
+    print("-" * 50)
+    for _, player in scores.loc[active].sort_values('hof_probability', ascending=False).head(15).iterrows():
+        print(f"{player['name']:25s} {player['hof_probability']:6.1%} "
+              f"{player['HR_sum']:4.0f} HR {player['H_sum']:5.0f} H {player['OPS_mean']:5.3f} OPS")
     
     return career_totals
 
@@ -543,92 +2025,74 @@ def analyze_age_curves(df):
 # 8️⃣ Visualization Functions
 # ------------------------------------------------------------------
 
-def create_comprehensive_visualizations(df, yearly_stats, career_stats, age_performance):
-    """Create a comprehensive dashboard of baseball analytics."""
-    
-    fig, axes = plt.subplots(3, 3, figsize=(20, 15))
-    fig.suptitle('Lahman Baseball Database Analysis Dashboard', fontsize=16, fontweight='bold')
+# Plot style is applied on first use of pyplot rather than at import
+_PLOT_STYLE_APPLIED = False
+
+def _pyplot():
+    """matplotlib.pyplot, imported on first use with the dashboard style applied."""
+    
+    global _PLOT_STYLE_APPLIED
+    import matplotlib.pyplot as plt
+    if not _PLOT_STYLE_APPLIED:
+        plt.style.use('seaborn-v0_8' if 'seaborn-v0_8' in plt.style.available else 'default')
+        _PLOT_STYLE_APPLIED = True
+    return plt
+
+# Scatter layers above this many points are downsampled (or rasterized)
+SCATTER_MAX_POINTS = 5_000
+DASHBOARD_FORMATS = ('png', 'svg')
+
+def _scatter(ax, x, y, max_points=None, downsample=True, seed=0, **kwargs):
     
-    # 1. Historical OPS Trends
-    axes[0,0].plot(yearly_stats.index, yearly_stats['OPS'], 'b-', linewidth=2, marker='o', markersize=3)
-    axes[0,0].set_xlabel('Year')
-    axes[0,0].set_ylabel('League Average OPS')
-    axes[0,0].set_title('Historical Offensive Trends')
-    axes[0,0].grid(True, alpha=0.3)
+    """
+    Scatter plot that stays cheap for large layers: above max_points the
+    layer is randomly downsampled, or kept whole but rasterized so vector
+    output does not carry one path per point.
+    """
     
-    # Add era shading
-    eras = [(1993, 2006, 'Steroid Era'), (2007, 2024, 'Modern Era')]
-    for start, end, label in eras:
-        if start in yearly_stats.index and end >= yearly_stats.index.min():
-            axes[0,0].axvspan(start, min(end, yearly_stats.index.max()), alpha=0.2, label=label)
-    axes[0,0].legend()
+    x, y = np.asarray(x), np.asarray(y)
+    if max_points is not None and len(x) > max_points:
+        if downsample:
+            keep = np.sort(np.random.default_rng(seed).choice(len(x), max_points, replace=False))
+            x, y = x[keep], y[keep]
+        kwargs['rasterized'] = True
+    ax.scatter(x, y, **kwargs)
+
+def _dashboard_inputs(df, yearly_stats, career_stats, age_performance):
     
-    # 2. Home Run Distribution
-    hr_data = df['HR'][df['AB'] >= 200]
-    axes[0,1].hist(hr_data, bins=30, alpha=0.7, color='red', edgecolor='black')
-    axes[0,1].axvline(hr_data.mean(), color='orange', linestyle='--', 
-                     label=f'Mean: {hr_data.mean():.1f}')
-    axes[0,1].set_xlabel('Home Runs per Season')
-    axes[0,1].set_ylabel('Frequency') 
-    axes[0,1].set_title('Distribution of Home Runs (200+ AB)')
-    axes[0,1].legend()
-    axes[0,1].grid(True, alpha=0.3)
+    """
+    The (small) data each dashboard panel draws, so panels can be rendered
+    in worker processes without shipping the full frame.
+    """
     
-    # 3. Power vs Contact
     qualified_recent = df[df['AB'] >= 300]
-    axes[0,2].scatter(qualified_recent['K_rate'], qualified_recent['HR_rate'], 
-                     alpha=0.5, color='purple')
-    axes[0,2].set_xlabel('Strikeout Rate')
-    axes[0,2].set_ylabel('Home Run Rate')
-    axes[0,2].set_title('Power vs Contact Trade-off')
-    axes[0,2].grid(True, alpha=0.3)
+    inputs = {
+        'ops_trend': yearly_stats[['OPS']],
+        'hr_distribution': df['HR'][df['AB'] >= 200],
+        'power_contact': (qualified_recent['K_rate'].to_numpy(), qualified_recent['HR_rate'].to_numpy()),
+        'career_length': None,
+        'strikeout_trend': yearly_stats['K_rate_league'].dropna(),
+        'age_curve': None,
+        'team_heatmap': None,
+        'position_ops': None,
+        'metric_correlation': None,
+    }
     
-    # 4. Career Length vs Performance
     if career_stats is not None:
         long_careers = career_stats[career_stats['AB_sum'] >= 2000]
-        axes[1,0].scatter(long_careers['career_length'], long_careers['OPS_mean'], alpha=0.6)
-        axes[1,0].set_xlabel('Career Length (Years)')
-        axes[1,0].set_ylabel('Average OPS')
-        axes[1,0].set_title('Career Length vs Performance')
-        axes[1,0].grid(True, alpha=0.3)
-    
-    # 5. Strikeout Rate Over Time
-    so_trend = yearly_stats['K_rate_league'].dropna()
-    axes[1,1].plot(so_trend.index, so_trend.values, 'g-', linewidth=2, marker='s', markersize=4)
-    axes[1,1].set_xlabel('Year')
-    axes[1,1].set_ylabel('League Strikeout Rate')
-    axes[1,1].set_title('Rise of Strikeouts')
-    axes[1,1].grid(True, alpha=0.3)
+        inputs['career_length'] = (long_careers['career_length'].to_numpy(), long_careers['OPS_mean'].to_numpy())
     
-    # 6. Age vs Performance
     if age_performance is not None and len(age_performance) > 0:
-        ages = age_performance.index
-        ops_by_age = age_performance['OPS_mean']
-        axes[1,2].plot(ages, ops_by_age, 'ro-', linewidth=2)
-        axes[1,2].set_xlabel('Age')
-        axes[1,2].set_ylabel('Average OPS')
-        axes[1,2].set_title('Age Curve (Performance vs Age)')
-        axes[1,2].grid(True, alpha=0.3)
-        
-        # Highlight peak performance age
-        peak_age = ops_by_age.idxmax()
-        axes[1,2].axvline(peak_age, color='gold', linestyle='--', 
-                         label=f'Peak: {peak_age}')
-        axes[1,2].legend()
+        inputs['age_curve'] = age_performance['OPS_mean']
     
-    # 7. Team Performance Heatmap (recent years)
+    # Team Performance Heatmap (recent years)
     recent_years = df[df['yearID'] >= df['yearID'].max() - 5]
     if 'teamID' in recent_years.columns:
-        team_year_ops = recent_years.groupby(['teamID', 'yearID'])['OPS'].mean().unstack(fill_value=np.nan)
-        
+        team_year_ops = recent_years.groupby(['teamID', 'yearID'], observed=True)['OPS'].mean().unstack(fill_value=np.nan)
         if not team_year_ops.empty:
-            sns.heatmap(team_year_ops, annot=True, fmt='.3f', cmap='RdYlBu_r', 
-                       ax=axes[2,0], cbar_kws={'label': 'Team OPS'})
-            axes[2,0].set_title('Team OPS by Year (Heatmap)')
-            axes[2,0].set_xlabel('Year')
-            axes[2,0].set_ylabel('Team')
+            inputs['team_heatmap'] = team_year_ops
     
-    # 8. Performance Distribution by Position
+    # Performance Distribution by Position
     if 'position' in df.columns or any(col.startswith('pos') for col in df.columns):
         # Try to find position data
         pos_col = None
@@ -638,26 +2102,199 @@ def create_comprehensive_visualizations(df, yearly_stats, career_stats, age_perf
                 break
         
         if pos_col:
-            pos_ops = df.groupby(pos_col)['OPS'].mean().sort_values(ascending=True)
-            axes[2,1].barh(range(len(pos_ops)), pos_ops.values, color='lightcoral')
-            axes[2,1].set_yticks(range(len(pos_ops)))
-            axes[2,1].set_yticklabels(pos_ops.index)
-            axes[2,1].set_xlabel('Average OPS')
-            axes[2,1].set_title('Offensive Production by Position')
-            axes[2,1].grid(True, alpha=0.3)
+            inputs['position_ops'] = df.groupby(pos_col)['OPS'].mean().sort_values(ascending=True)
     
-    # 9. Correlation Heatmap
     metrics = ['AVG', 'OBP', 'SLG', 'OPS', 'HR_rate', 'BB_rate', 'K_rate']
     available_metrics = [m for m in metrics if m in df.columns]
-    
     if len(available_metrics) >= 3:
-        corr_matrix = df[available_metrics].corr()
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0,
-                   fmt='.2f', ax=axes[2,2])
-        axes[2,2].set_title('Hitting Metrics Correlation')
+        inputs['metric_correlation'] = df[available_metrics].corr()
     
-    plt.tight_layout()
-    plt.show()
+    return inputs
+
+def _panel_ops_trend(ax, yearly_stats, **scatter_opts):
+    # 1. Historical OPS Trends
+    ax.plot(yearly_stats.index, yearly_stats['OPS'], 'b-', linewidth=2, marker='o', markersize=3)
+    ax.set_xlabel('Year')
+    ax.set_ylabel('League Average OPS')
+    ax.set_title('Historical Offensive Trends')
+    ax.grid(True, alpha=0.3)
+    
+    # Add era shading
+    eras = [(1993, 2006, 'Steroid Era'), (2007, 2024, 'Modern Era')]
+    for start, end, label in eras:
+        if start in yearly_stats.index and end >= yearly_stats.index.min():
+            ax.axvspan(start, min(end, yearly_stats.index.max()), alpha=0.2, label=label)
+    ax.legend()
+
+def _panel_hr_distribution(ax, hr_data, **scatter_opts):
+    # 2. Home Run Distribution
+    ax.hist(hr_data, bins=30, alpha=0.7, color='red', edgecolor='black')
+    ax.axvline(hr_data.mean(), color='orange', linestyle='--', 
+               label=f'Mean: {hr_data.mean():.1f}')
+    ax.set_xlabel('Home Runs per Season')
+    ax.set_ylabel('Frequency') 
+    ax.set_title('Distribution of Home Runs (200+ AB)')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+def _panel_power_contact(ax, points, **scatter_opts):
+    # 3. Power vs Contact
+    _scatter(ax, *points, alpha=0.5, color='purple', **scatter_opts)
+    ax.set_xlabel('Strikeout Rate')
+    ax.set_ylabel('Home Run Rate')
+    ax.set_title('Power vs Contact Trade-off')
+    ax.grid(True, alpha=0.3)
+
+def _panel_career_length(ax, points, **scatter_opts):
+    # 4. Career Length vs Performance
+    _scatter(ax, *points, alpha=0.6, **scatter_opts)
+    ax.set_xlabel('Career Length (Years)')
+    ax.set_ylabel('Average OPS')
+    ax.set_title('Career Length vs Performance')
+    ax.grid(True, alpha=0.3)
+
+def _panel_strikeout_trend(ax, so_trend, **scatter_opts):
+    # 5. Strikeout Rate Over Time
+    ax.plot(so_trend.index, so_trend.values, 'g-', linewidth=2, marker='s', markersize=4)
+    ax.set_xlabel('Year')
+    ax.set_ylabel('League Strikeout Rate')
+    ax.set_title('Rise of Strikeouts')
+    ax.grid(True, alpha=0.3)
+
+def _panel_age_curve(ax, ops_by_age, **scatter_opts):
+    # 6. Age vs Performance
+    ax.plot(ops_by_age.index, ops_by_age, 'ro-', linewidth=2)
+    ax.set_xlabel('Age')
+    ax.set_ylabel('Average OPS')
+    ax.set_title('Age Curve (Performance vs Age)')
+    ax.grid(True, alpha=0.3)
+    
+    # Highlight peak performance age
+    peak_age = ops_by_age.idxmax()
+    ax.axvline(peak_age, color='gold', linestyle='--', 
+               label=f'Peak: {peak_age}')
+    ax.legend()
+
+def _panel_team_heatmap(ax, team_year_ops, **scatter_opts):
+    import seaborn as sns
+    # 7. Team Performance Heatmap (recent years)
+    sns.heatmap(team_year_ops, annot=True, fmt='.3f', cmap='RdYlBu_r', 
+                ax=ax, cbar_kws={'label': 'Team OPS'})
+    ax.set_title('Team OPS by Year (Heatmap)')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Team')
+
+def _panel_position_ops(ax, pos_ops, **scatter_opts):
+    # 8. Performance Distribution by Position
+    ax.barh(range(len(pos_ops)), pos_ops.values, color='lightcoral')
+    ax.set_yticks(range(len(pos_ops)))
+    ax.set_yticklabels(pos_ops.index)
+    ax.set_xlabel('Average OPS')
+    ax.set_title('Offensive Production by Position')
+    ax.grid(True, alpha=0.3)
+
+def _panel_metric_correlation(ax, corr_matrix, **scatter_opts):
+    import seaborn as sns
+    # 9. Correlation Heatmap
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0,
+                fmt='.2f', ax=ax)
+    ax.set_title('Hitting Metrics Correlation')
+
+# Dashboard panels in 3x3 grid order
+DASHBOARD_PANELS = [
+    ('ops_trend', _panel_ops_trend),
+    ('hr_distribution', _panel_hr_distribution),
+    ('power_contact', _panel_power_contact),
+    ('career_length', _panel_career_length),
+    ('strikeout_trend', _panel_strikeout_trend),
+    ('age_curve', _panel_age_curve),
+    ('team_heatmap', _panel_team_heatmap),
+    ('position_ops', _panel_position_ops),
+    ('metric_correlation', _panel_metric_correlation),
+]
+
+def _init_render_worker():
+    plt = _pyplot()
+    plt.switch_backend('Agg')
+
+def _render_panel(position, name, draw, data, path, scatter_opts):
+    """Draw one panel into its own figure and save it; returns render seconds."""
+    
+    plt = _pyplot()
+    
+    start = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(20 / 3, 5))
+    if data is not None:
+        draw(ax, data, **scatter_opts)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return position, name, path, time.perf_counter() - start
+
+def create_comprehensive_visualizations(df, yearly_stats, career_stats, age_performance,
+                                        output_dir=None, fmt='png', workers=None,
+                                        max_points=SCATTER_MAX_POINTS, downsample=True):
+    
+    """
+    Create a comprehensive dashboard of baseball analytics.
+    
+    Without output_dir the 3x3 figure is drawn and shown interactively.
+    With output_dir the dashboard is rendered headless (Agg backend): each
+    panel is saved as its own PNG/SVG file, rendered in parallel worker
+    processes when workers > 1. Scatter layers above max_points are
+    downsampled (or only rasterized with downsample=False). Returns a
+    DataFrame of per-panel render timings.
+    """
+    
+    plt = _pyplot()
+    
+    inputs = _dashboard_inputs(df, yearly_stats, career_stats, age_performance)
+    scatter_opts = {'max_points': max_points, 'downsample': downsample}
+    
+    if output_dir is None:
+        fig, axes = plt.subplots(3, 3, figsize=(20, 15))
+        fig.suptitle('Lahman Baseball Database Analysis Dashboard', fontsize=16, fontweight='bold')
+        
+        timings = []
+        for position, ((name, draw), ax) in enumerate(zip(DASHBOARD_PANELS, axes.flat)):
+            start = time.perf_counter()
+            if inputs[name] is not None:
+                draw(ax, inputs[name], **scatter_opts)
+            timings.append((position + 1, name, None, time.perf_counter() - start))
+        
+        plt.tight_layout()
+        plt.show()
+    else:
+        if fmt not in DASHBOARD_FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; choose from {DASHBOARD_FORMATS}")
+        if workers is None:
+            workers = min(len(DASHBOARD_PANELS), os.cpu_count() or 1)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        jobs = [(position + 1, name, draw, inputs[name],
+                 os.path.join(output_dir, f'{position + 1:02d}_{name}.{fmt}'), scatter_opts)
+                for position, (name, draw) in enumerate(DASHBOARD_PANELS)]
+        
+        if workers <= 1:
+            backend = plt.get_backend()
+            _init_render_worker()
+            try:
+                timings = [_render_panel(*job) for job in jobs]
+            finally:
+                plt.switch_backend(backend)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as executor:
+                timings = list(executor.map(_render_panel, *zip(*jobs)))
+    
+    timings = pd.DataFrame(timings, columns=['panel', 'name', 'path', 'seconds']).set_index('panel')
+    
+    print(f"\nDashboard Panel Render Times ({'interactive' if output_dir is None else output_dir}):")
+    print("-" * 40)
+    for panel, row in timings.iterrows():
+        print(f"  {panel}. {row['name']:20s} {row['seconds']:6.3f}s")
+    print(f"  Total panel time: {timings['seconds'].sum():.3f}s")
+    
+    return timings
 
 # ------------------------------------------------------------------
 # 9️⃣ Advanced Sabermetric Analysis
@@ -673,7 +2310,7 @@ def calculate_advanced_sabermetrics(df):
     # Calculate park factors (simplified approach)
     if 'teamID' in df.columns:
         # Home vs road performance proxy
-        team_stats = df.groupby(['teamID', 'yearID']).agg({
+        team_stats = df.groupby(['teamID', 'yearID'], observed=True).agg({
             'HR': 'sum',
             'AB': 'sum',
             'H': 'sum'
@@ -682,26 +2319,20 @@ def calculate_advanced_sabermetrics(df):
         team_stats['HR_rate'] = team_stats['HR'] / team_stats['AB']
         team_stats['AVG'] = team_stats['H'] / team_stats['AB']
         
-        # Calculate relative team performance
-        yearly_league_avg = df.groupby('yearID')[['HR_rate', 'AVG']].mean()
-        
         # This is a simplified park factor calculation
         print("Team Environment Analysis (Top 10 HR-friendly):")
         print("-" * 45)
         
         recent_teams = team_stats[team_stats.index.get_level_values(1) >= df['yearID'].max() - 3]
-        hr_friendly = recent_teams.groupby('teamID')['HR_rate'].mean().sort_values(ascending=False)
+        hr_friendly = recent_teams.groupby('teamID', observed=True)['HR_rate'].mean().sort_values(ascending=False)
         
         for i, (team, hr_rate) in enumerate(hr_friendly.head(10).items(), 1):
             print(f"{i:2d}. {team}: {hr_rate:.4f} HR rate")
     
-    # Calculate BABIP luck analysis
-    df['expected_BABIP'] = 0.300  # League average approximation
-    df['BABIP'] = (df['H'] - df['HR']) / (df['AB'] - df['SO'] - df['HR'])
-    df['BABIP_luck'] = df['BABIP'] - df['expected_BABIP']
-    
-    # Players with extreme BABIP (potential regression candidates)
+    # Players with extreme BABIP (potential regression candidates); BABIP
+    # luck is computed for these rows only, without touching df
     recent_qualified = df[(df['yearID'] >= df['yearID'].max() - 2) & (df['AB'] >= 300)]
+    recent_qualified = recent_qualified.join(compute_metrics(recent_qualified, ['BABIP', 'BABIP_luck']))
     
     print(f"\nBABIP Analysis (Potential Regression Candidates):")
     print("-" * 50)
@@ -723,148 +2354,597 @@ def calculate_advanced_sabermetrics(df):
 # 🔟 Performance Optimization Analysis
 # ------------------------------------------------------------------
 
-def optimize_lineup_production(df):
-    """Use optimization to find the best lineup construction."""
+# Batting-order slots: (description, role score used to fill the slot)
+LINEUP_SLOTS = {
+    1: ("Leadoff (Speed/OBP)", 'leadoff_score'),
+    2: ("Contact Hitter", 'contact_score'),
+    3: ("Best Overall Hitter", 'overall_score'),
+    4: ("Power (RBI)", 'power_score'),
+    5: ("Power (RBI)", 'power_score'),
+    6: ("Gap Power", 'gap_score'),
+    7: ("Contact/Speed", 'speed_score'),
+    8: ("Utility/Defense", 'overall_score'),
+    9: ("Pitcher/Weak Hitter", 'overall_score')
+}
+# Approximate plate appearances per game by slot; earlier slots bat more often
+SLOT_PA_WEIGHTS = np.array([4.65, 4.55, 4.43, 4.33, 4.24, 4.13, 4.02, 3.90, 3.77])
+
+def lineup_role_scores(players):
+    """Composite scores for each lineup role, one column per role."""
+    
+    sb = players['SB'].fillna(0)
+    contact = players['AVG'] * 0.5 + (1 - players['K_rate']) * 0.5
+    
+    return pd.DataFrame({
+        'leadoff_score': players['OBP'] * 0.5 + sb * 0.01 + (1 - players['K_rate']) * 0.3,
+        'power_score': players['SLG'] * 0.4 + players['HR'] * 0.01 + players['RBI'] * 0.002,
+        'contact_score': contact,
+        'overall_score': players['OPS'] * 0.6 + players['wOBA'] * 0.4,
+        'gap_score': players['ISO'] * 0.5 + players['2B'] / players['AB'] * 2,
+        'speed_score': contact + sb * 0.01
+    }, index=players.index)
+
+def _slot_score_matrix(players, groups):
     
-    print(f"\n{'='*60}")
-    print("LINEUP OPTIMIZATION ANALYSIS")
-    print('='*60)
+    """
+    Player × slot scores: each role score is standardized within its group
+    (so roles on different scales compete fairly) and weighted by the
+    slot's expected plate appearances.
+    """
     
-    # Get recent qualified players
-    recent_year = df['yearID'].max()
-    qualified_players = df[
-        (df['yearID'] == recent_year) & 
-        (df['AB'] >= 400)  # Regular players
-    ].copy()
+    roles = lineup_role_scores(players)
+    grouped = roles.groupby(groups)
+    z = ((roles - grouped.transform('mean')) / grouped.transform('std').replace(0, 1)).fillna(0)
     
-    if len(qualified_players) < 9:
-        print("Insufficient qualified players for lineup analysis")
-        return None
+    slot_roles = [role for _, role in LINEUP_SLOTS.values()]
+    return z[slot_roles].to_numpy() * SLOT_PA_WEIGHTS
+
+def _assign_lineups(scores, group_codes, n_groups):
     
-    # Define lineup positions and their typical characteristics
-    lineup_positions = {
-        1: "Leadoff (Speed/OBP)",
-        2: "Contact Hitter", 
-        3: "Best Overall Hitter",
-        4: "Power (RBI)",
-        5: "Power (RBI)", 
-        6: "Gap Power",
-        7: "Contact/Speed",
-        8: "Utility/Defense",
-        9: "Pitcher/Weak Hitter"
-    }
+    """
+    Solve every group's 9-slot assignment problem in one matching call.
     
-    # Calculate composite scores for different lineup roles
-    qualified_players['leadoff_score'] = (
-        qualified_players['OBP'] * 0.5 + 
-        qualified_players['SB'].fillna(0) * 0.01 +
-        (1 - qualified_players['K_rate']) * 0.3
-    )
+    Slots of all groups form one side of a block-diagonal bipartite graph
+    and players the other; a maximum-weight full matching of the slots is
+    then the optimal assignment of each group independently. Every group
+    needs at least nine players. Returns an (n_groups, 9) array of player
+    row positions.
+    """
     
-    qualified_players['power_score'] = (
-        qualified_players['SLG'] * 0.4 +
-        qualified_players['HR'] * 0.01 +
-        qualified_players['RBI'] * 0.002
-    )
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
     
-    qualified_players['contact_score'] = (
-        qualified_players['AVG'] * 0.5 +
-        (1 - qualified_players['K_rate']) * 0.5
-    )
+    n_players, n_slots = scores.shape
+    rows = (group_codes[:, None] * n_slots + np.arange(n_slots)).ravel()
+    cols = np.repeat(np.arange(n_players), n_slots)
+    # Shift weights positive: a stored zero would read as a missing edge, and
+    # a constant shift does not change which full matching is best
+    weights = (scores - scores.min() + 1).ravel()
     
-    qualified_players['overall_score'] = (
-        qualified_players['OPS'] * 0.6 +
-        qualified_players['wOBA'] * 0.4
-    )
+    biadjacency = csr_matrix((weights, (rows, cols)), shape=(n_groups * n_slots, n_players))
+    slot_rows, player_cols = min_weight_full_bipartite_matching(biadjacency, maximize=True)
+    
+    lineup_pos = np.empty(n_groups * n_slots, dtype=int)
+    lineup_pos[slot_rows] = player_cols
+    return lineup_pos.reshape(n_groups, n_slots)
+
+def optimize_lineups_all_teams(df, min_ab=100):
+    
+    """
+    Optimal 9-slot batting order for every team-season in one call.
+    
+    A player's stints for the team are combined first, then the team's
+    players with at least min_ab at-bats are used; team-seasons with fewer
+    than nine such players are skipped. Returns one row per
+    (teamID, yearID, slot).
+    """
+    
+    players = combine_stints(df, keys=['playerID', 'teamID', 'yearID'])
+    players = players[players['AB'] >= min_ab]
+    group_keys = players.groupby(['teamID', 'yearID'], observed=True)['playerID'].transform('size')
+    players = players[(group_keys >= 9).to_numpy()]
+    if len(players) == 0:
+        return pd.DataFrame(columns=['teamID', 'yearID', 'slot', 'role', 'playerID', 'fullName', 'score'])
+    
+    group_codes, group_index = pd.MultiIndex.from_arrays(
+        [players['teamID'].astype(str), players['yearID']]
+    ).factorize()
+    scores = _slot_score_matrix(players, group_codes)
+    lineup_pos = _assign_lineups(scores, group_codes, len(group_index))
+    
+    picked = players.iloc[lineup_pos.ravel()]
+    n_groups = len(group_index)
+    lineup_ids = picked['playerID'].to_numpy().reshape(n_groups, 9)
+    repeated = [(str(team), int(year)) for (team, year), ids in zip(group_index, lineup_ids)
+                if len(set(ids)) < 9]
+    if repeated:
+        raise ValueError(f"A player was placed in two batting slots for (teamID, yearID) {repeated}")
+    return pd.DataFrame({
+        'teamID': np.repeat(group_index.get_level_values(0), 9),
+        'yearID': np.repeat(group_index.get_level_values(1), 9),
+        'slot': np.tile(np.arange(1, 10), n_groups),
+        'role': np.tile([desc for desc, _ in LINEUP_SLOTS.values()], n_groups),
+        'playerID': picked['playerID'].to_numpy(),
+        'fullName': picked['fullName'].to_numpy() if 'fullName' in picked.columns else picked['playerID'].to_numpy(),
+        'score': scores[lineup_pos.ravel(), np.tile(np.arange(9), n_groups)]
+    }).sort_values(['teamID', 'yearID', 'slot'], ignore_index=True)
+
+def optimize_lineup_production(df):
+    """Use optimization to find the best lineup construction."""
+    
+    print(f"\n{'='*60}")
+    print("LINEUP OPTIMIZATION ANALYSIS")
+    print('='*60)
+    
+    # Get recent qualified players
+    recent_year = df['yearID'].max()
+    qualified_players = df[
+        (df['yearID'] == recent_year) & 
+        (df['AB'] >= 400)  # Regular players
+    ].copy()
+    
+    if len(qualified_players) < 9:
+        print("Insufficient qualified players for lineup analysis")
+        return None
+    
+    # Solve the full 9-slot assignment over the whole qualified pool
+    scores = _slot_score_matrix(qualified_players, np.zeros(len(qualified_players), dtype=int))
+    lineup_pos = _assign_lineups(scores, np.zeros(len(qualified_players), dtype=int), 1)[0]
     
     print("Optimal Lineup Construction:")
     print("-" * 40)
     
-    # Build optimal lineup
-    used_players = set()
+    stat_lines = {
+        'leadoff_score': lambda p: f"OBP: {p['OBP']:.3f}",
+        'contact_score': lambda p: f"AVG: {p['AVG']:.3f}",
+        'overall_score': lambda p: f"OPS: {p['OPS']:.3f}",
+        'power_score': lambda p: f"SLG: {p['SLG']:.3f}, HR: {p['HR']}",
+        'gap_score': lambda p: f"ISO: {p['ISO']:.3f}, 2B: {p['2B']}",
+        'speed_score': lambda p: f"AVG: {p['AVG']:.3f}, SB: {p['SB']}"
+    }
+    
     optimal_lineup = {}
+    for slot, pos in zip(LINEUP_SLOTS, lineup_pos):
+        player = qualified_players.iloc[pos]
+        optimal_lineup[slot] = player
+        role = LINEUP_SLOTS[slot][1]
+        print(f"{slot}. {player.get('fullName', player['playerID']):25s} {stat_lines[role](player)}")
     
-    # 1. Leadoff - best OBP/speed combination
-    leadoff = qualified_players.loc[~qualified_players['playerID'].isin(used_players)].nlargest(1, 'leadoff_score')
-    if not leadoff.empty:
-        player = leadoff.iloc[0]
-        optimal_lineup[1] = player
-        used_players.add(player['playerID'])
-        print(f"1. {player.get('fullName', player['playerID']):25s} OBP: {player['OBP']:.3f}")
-    
-    # 3. Best overall hitter
-    best_overall = qualified_players.loc[~qualified_players['playerID'].isin(used_players)].nlargest(1, 'overall_score')
-    if not best_overall.empty:
-        player = best_overall.iloc[0]
-        optimal_lineup[3] = player
-        used_players.add(player['playerID'])
-        print(f"3. {player.get('fullName', player['playerID']):25s} OPS: {player['OPS']:.3f}")
-    
-    # 4-5. Power hitters
-    for pos in [4, 5]:
-        power_hitter = qualified_players.loc[~qualified_players['playerID'].isin(used_players)].nlargest(1, 'power_score')
-        if not power_hitter.empty:
-            player = power_hitter.iloc[0]
-            optimal_lineup[pos] = player
-            used_players.add(player['playerID'])
-            print(f"{pos}. {player.get('fullName', player['playerID']):25s} SLG: {player['SLG']:.3f}, HR: {player['HR']}")
-    
-    # 2. Contact hitter
-    contact_hitter = qualified_players.loc[~qualified_players['playerID'].isin(used_players)].nlargest(1, 'contact_score')
-    if not contact_hitter.empty:
-        player = contact_hitter.iloc[0]
-        optimal_lineup[2] = player
-        used_players.add(player['playerID'])
-        print(f"2. {player.get('fullName', player['playerID']):25s} AVG: {player['AVG']:.3f}")
+    lineup_players = qualified_players.iloc[lineup_pos]
+    runs = simulate_lineups(event_probabilities(lineup_players).to_numpy(), [np.arange(9)],
+                            n_games=2000, rng=np.random.default_rng(0))
+    print(f"Simulated run expectancy: {runs.mean():.2f} runs/game")
     
     return optimal_lineup
 
+# Plate-appearance outcomes used by the run-expectancy simulator, in CDF order
+PA_EVENTS = ['1B', '2B', '3B', 'HR', 'BB', 'HBP', 'SO', 'out']
+
+def event_probabilities(players):
+    
+    """
+    Per-plate-appearance outcome probabilities for each player (PA_EVENTS columns).
+    
+    'out' is every plate appearance that is not a hit, walk, HBP or strikeout
+    (including sacrifices), so each row sums to one.
+    """
+    
+    pa = players['AB'] + players['BB'] + players['HBP'] + players['SF'] + players['SH']
+    probs = pd.DataFrame({event: players[event] / pa for event in PA_EVENTS[:-1]}, index=players.index)
+    probs = probs.clip(lower=0).fillna(0)
+    probs['out'] = (1 - probs.sum(axis=1)).clip(lower=0)
+    return probs.div(probs.sum(axis=1), axis=0)
+
+def _base_transitions():
+    
+    """
+    (event, bases) -> new bases, runs scored, outs added. Bases are a 3-bit
+    mask (1 = first, 2 = second, 4 = third). Singles score runners from
+    second and third, doubles everyone but the runner from first (who stops
+    at third), walks and HBP advance forced runners only.
+    """
+    
+    new_bases = np.zeros((len(PA_EVENTS), 8), dtype=np.int8)
+    runs = np.zeros((len(PA_EVENTS), 8), dtype=np.int8)
+    outs = np.array([0, 0, 0, 0, 0, 0, 1, 1], dtype=np.int8)
+    
+    for bases in range(8):
+        on1, on2, on3 = bases & 1, (bases >> 1) & 1, (bases >> 2) & 1
+        new_bases[0, bases], runs[0, bases] = 1 | (on1 << 1), on2 + on3
+        new_bases[1, bases], runs[1, bases] = 2 | (on1 << 2), on2 + on3
+        new_bases[2, bases], runs[2, bases] = 4, on1 + on2 + on3
+        new_bases[3, bases], runs[3, bases] = 0, on1 + on2 + on3 + 1
+        
+        if not on1:
+            forced, forced_runs = bases | 1, 0
+        elif not on2:
+            forced, forced_runs = bases | 3, 0
+        else:
+            forced, forced_runs = 7, on3
+        for event in (4, 5):
+            new_bases[event, bases], runs[event, bases] = forced, forced_runs
+        
+        new_bases[6, bases] = new_bases[7, bases] = bases
+    
+    return new_bases, runs, outs
+
+NEW_BASES, RUNS_SCORED, OUTS_ADDED = _base_transitions()
+
+def simulate_lineups(probs, orders, n_games=1000, innings=9, rng=None):
+    
+    """
+    Simulate n_games games for each batting order, all in parallel arrays.
+    
+    probs is an (n_players, len(PA_EVENTS)) probability array and orders an
+    (n_orders, 9) array of player rows. Every simulated game advances one
+    plate appearance per step; bases, outs and the batting slot carry the
+    state. Returns an (n_orders, n_games) array of runs per game.
+    """
+    
+    rng = np.random.default_rng() if rng is None else rng
+    orders = np.asarray(orders)
+    n_orders = len(orders)
+    n_sims = n_orders * n_games
+    
+    # Cumulative outcome probabilities per (order, slot)
+    slot_cdf = np.cumsum(np.asarray(probs, dtype=np.float32), axis=1)[orders]
+    slot_cdf[..., -1] = 1.0
+    
+    sim_order = np.repeat(np.arange(n_orders), n_games)
+    slot = np.zeros(n_sims, dtype=np.int64)
+    bases = np.zeros(n_sims, dtype=np.int8)
+    outs = np.zeros(n_sims, dtype=np.int8)
+    inning = np.zeros(n_sims, dtype=np.int16)
+    runs = np.zeros(n_sims, dtype=np.int32)
+    live = np.arange(n_sims)
+    
+    while len(live):
+        # Draw every live game's plate appearance at once by inverse CDF
+        cdf = slot_cdf[sim_order[live], slot[live]]
+        u = rng.random(len(live), dtype=np.float32)
+        event = (u[:, None] > cdf).sum(axis=1)
+        
+        b = bases[live]
+        runs[live] += RUNS_SCORED[event, b]
+        bases[live] = NEW_BASES[event, b]
+        outs[live] += OUTS_ADDED[event]
+        slot[live] = (slot[live] + 1) % 9
+        
+        ended = live[outs[live] >= 3]
+        inning[ended] += 1
+        outs[ended] = 0
+        bases[ended] = 0
+        live = live[inning[live] < innings]
+    
+    return runs.reshape(n_orders, n_games)
+
+def _simulate_chunk(probs, orders, n_games, seed):
+    return simulate_lineups(probs, orders, n_games, rng=np.random.default_rng(seed)).mean(axis=1)
+
+def rank_batting_orders(players, orders=None, n_games=200, chunk_size=2000, workers=1, seed=0):
+    
+    """
+    Rank batting orders of nine players by simulated expected runs per game.
+    
+    orders defaults to all 9! permutations, which requires exactly nine
+    players; pass explicit orders otherwise. Orders are simulated in chunks
+    (bounding memory); with workers > 1 the chunks run in a process pool.
+    Each chunk gets its own SeedSequence child, so results are reproducible
+    for a given seed, chunk_size and worker count alike. Reports the
+    simulated innings per second.
+    """
+    
+    if orders is None and len(players) != 9:
+        raise ValueError(f"orders defaults to the 9! permutations of nine players; got {len(players)} "
+                         "players, so pass explicit orders")
+    
+    probs = event_probabilities(players).to_numpy()
+    if orders is None:
+        orders = np.array(list(itertools.permutations(range(len(players)))), dtype=np.int8)
+    orders = np.asarray(orders)
+    
+    chunks = [orders[i:i + chunk_size] for i in range(0, len(orders), chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            expected = list(executor.map(_simulate_chunk, [probs] * len(chunks), chunks,
+                                         [n_games] * len(chunks), seeds))
+    else:
+        expected = [_simulate_chunk(probs, chunk, n_games, seq) for chunk, seq in zip(chunks, seeds)]
+    elapsed = time.perf_counter() - start
+    
+    innings = len(orders) * n_games * 9
+    print(f"Simulated {innings:,} innings in {elapsed:.2f}s ({innings / elapsed:,.0f} innings/s)")
+    
+    names = players['fullName'] if 'fullName' in players.columns else players['playerID']
+    names = np.asarray(names, dtype=object)
+    ranking = pd.DataFrame({
+        'order': [tuple(names[order]) for order in orders],
+        'expected_runs': np.concatenate(expected)
+    })
+    return ranking.sort_values('expected_runs', ascending=False, ignore_index=True)
+
 # ------------------------------------------------------------------
 # 1️⃣1️⃣ Main Execution Pipeline
 # ------------------------------------------------------------------
 
-def main():
-    """Execute the complete Lahman baseball analysis pipeline."""
+# Analysis stages run by main(): (name, function, upstream stages). Each function
+# is called as function(df, *upstream_results); the list is in dependency order
+# and is also the order in which stage output is printed. League-season
+# aggregates are a stage of their own and passed to the stages that read them,
+# so pool workers receive them instead of each recomputing them (the
+# league_season_aggregates memo only spans one process).
+PIPELINE_STAGES = [
+    ('league', league_season_aggregates, []),
+    ('yearly_stats', analyze_historical_trends, ['league']),
+    ('statistical_tests', perform_statistical_tests, []),
+    ('career_table', build_career_table, []),
+    ('career_stats', analyze_player_careers, ['career_table']),
+    ('age_performance', analyze_age_curves, []),
+    ('era_adjusted', calculate_era_adjustments, ['league']),
+    ('sabermetrics', calculate_advanced_sabermetrics, []),
+    ('hof_analysis', predict_hall_of_fame_candidates, ['career_table']),
+    ('optimal_lineup', optimize_lineup_production, [])
+]
+
+def _precomputed_stage(df, result):
+    """Stage function for a result computed before the pipeline (e.g. by a lazy backend)."""
+    return result
+
+def _replace_stage(stages, name, func):
+    """A copy of stages with name's function swapped, keeping its position and dependencies."""
+    return [(stage, func if stage == name else stage_func, deps) for stage, stage_func, deps in stages]
+
+# Season table as seen by a pool worker, memory-mapped once per process
+_WORKER_FRAME = None
+
+def _export_shared_frame(df, directory):
     
-    print("⚾ LAHMAN BASEBALL DATABASE ANALYSIS PROJECT ⚾")
-    print("=" * 60)
+    """
+    Write df so pool workers can map it read-only instead of unpickling a copy.
     
-    # Load data
-    batting, people, teams = load_lahman_data()
+    Numeric columns become one .npy file each (opened with mmap_mode='r');
+    the remaining object/string/categorical columns are pickled.
+    """
     
-    if batting is None:
-        print("Could not load data. Exiting...")
-        return
+    numeric, other = {}, {}
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+            numeric[col] = f'col{i}.npy'
+            np.save(os.path.join(directory, numeric[col]), values.to_numpy())
+        else:
+            other[col] = values
+    
+    with open(os.path.join(directory, 'frame.pkl'), 'wb') as fh:
+        pickle.dump({'columns': list(df.columns), 'index': df.index,
+                     'numeric': numeric, 'other': other}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _load_shared_frame(directory):
+    
+    with open(os.path.join(directory, 'frame.pkl'), 'rb') as fh:
+        meta = pickle.load(fh)
+    
+    columns = {}
+    for col in meta['columns']:
+        if col in meta['numeric']:
+            values = np.load(os.path.join(directory, meta['numeric'][col]), mmap_mode='r')
+            columns[col] = pd.Series(values, index=meta['index'], copy=False)
+        else:
+            columns[col] = meta['other'][col]
+    
+    return pd.DataFrame(columns, copy=False)
+
+def _init_stage_worker(frame_dir):
+    global _WORKER_FRAME
+    _WORKER_FRAME = _load_shared_frame(frame_dir)
+
+def _run_stage(func, args, df=None):
+    """Run one stage, capturing what it prints so output can be replayed in order."""
+    
+    if df is None:
+        df = _WORKER_FRAME
+    
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = func(df, *args)
+    return result, buffer.getvalue()
+
+def _callable_fingerprint(func):
+    """The stage callable and, for a partial, its bound arguments (frames and arrays by content)."""
+    
+    if isinstance(func, functools.partial):
+        return [_callable_fingerprint(func.func), [_callable_fingerprint(arg) for arg in func.args],
+                {key: _callable_fingerprint(arg) for key, arg in sorted(func.keywords.items())}]
+    if isinstance(func, (pd.DataFrame, pd.Series)):
+        return _frame_fingerprint(func.to_frame() if isinstance(func, pd.Series) else func)
+    if isinstance(func, np.ndarray):
+        return hashlib.sha256(func.tobytes() + str(func.dtype).encode()).hexdigest()
+    if callable(func):
+        return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    return repr(func)
+
+def _stage_cache_key(name, frame_key, dep_keys, func=None):
+    
+    # The module source is part of the key, so any code change invalidates
+    # stages; so are a partial's bound arguments (e.g. the HOF labels)
+    with open(os.path.abspath(__file__), 'rb') as fh:
+        source_hash = hashlib.sha256(fh.read()).hexdigest()
     
-    # Preprocess data
-    df = preprocess_batting_data(batting, people, teams, min_year=1980, min_ab=50)
+    payload = json.dumps([name, frame_key, dep_keys, source_hash, _callable_fingerprint(func)])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def _write_pickle_atomic(obj, path):
+    """Pickle obj to path via a temporary file, so concurrent readers never see a partial file."""
     
-    # Historical trends
-    yearly_stats = analyze_historical_trends(df)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), delete=False) as fh:
+        pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(fh.name, path)
+
+def _frame_fingerprint(df):
     
-    # Statistical analysis
-    perform_statistical_tests(df)
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha256(row_hashes.tobytes())
+    digest.update(repr([(col, str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    return digest.hexdigest()
+
+def run_pipeline_stages(df, stages=PIPELINE_STAGES, workers=None, cache_dir=None):
     
-    # Career analysis
-    career_stats = analyze_player_careers(df)
+    """
+    Run analysis stages as a dependency graph.
     
-    # Age curves
-    age_performance = analyze_age_curves(df)
+    Stages whose upstream results are ready run concurrently in a process
+    pool; workers memory-map a read-only copy of df. With workers=1 the
+    stages run in this process in declaration order. Printed output is
+    replayed in declaration order regardless of completion order.
+    
+    With cache_dir, each stage's result and output are pickled under a key
+    built from df's contents, upstream keys, the stage's bound arguments
+    and this module's source, so a rerun on unchanged inputs skips the
+    stage.
+    
+    Returns a dict of stage name -> result.
+    """
     
-    # Era adjustments
-    df_era_adjusted = calculate_era_adjustments(df)
+    names = [name for name, _, _ in stages]
+    results, outputs, keys = {}, {}, {}
+    pending = list(stages)
+    running = {}
+    emitted = 0
     
-    # Advanced sabermetrics
-    calculate_advanced_sabermetrics(df)
+    frame_key = _frame_fingerprint(df) if cache_dir else None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
     
-    # Hall of Fame analysis
-    hof_analysis = predict_hall_of_fame_candidates(df)
+    if workers is None:
+        workers = min(len(stages), os.cpu_count() or 1)
+    
+    frame_dir = executor = None
+    if workers > 1:
+        frame_dir = tempfile.TemporaryDirectory(prefix='lahman_frame_')
+        _export_shared_frame(df, frame_dir.name)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_stage_worker,
+                                       initargs=(frame_dir.name,))
+    
+    def finish(name, result, output):
+        results[name], outputs[name] = result, output
+        if cache_dir:
+            _write_pickle_atomic((result, output), os.path.join(cache_dir, f'{name}-{keys[name]}.pkl'))
+    
+    try:
+        while pending or running:
+            ready = [stage for stage in pending if all(dep in results for dep in stage[2])]
+            if not ready and not running:
+                raise ValueError(f"Unresolvable stage dependencies: {[stage[0] for stage in pending]}")
+            
+            for stage in ready:
+                pending.remove(stage)
+                name, func, deps = stage
+                args = [results[dep] for dep in deps]
+                
+                if cache_dir:
+                    keys[name] = _stage_cache_key(name, frame_key, [keys[dep] for dep in deps], func)
+                    cache_path = os.path.join(cache_dir, f'{name}-{keys[name]}.pkl')
+                    if os.path.exists(cache_path):
+                        # An unreadable entry (e.g. written by an older version) is a miss
+                        try:
+                            with open(cache_path, 'rb') as fh:
+                                results[name], outputs[name] = pickle.load(fh)
+                            continue
+                        except Exception as e:
+                            print(f"Ignoring unreadable stage cache {os.path.basename(cache_path)}: {e}")
+                
+                if executor is None:
+                    finish(name, *_run_stage(func, args, df))
+                else:
+                    running[executor.submit(_run_stage, func, args)] = name
+            
+            # Print every stage whose predecessors in declaration order have printed
+            while emitted < len(names) and names[emitted] in outputs:
+                print(outputs[names[emitted]], end='')
+                emitted += 1
+            
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), *future.result())
+        
+        while emitted < len(names):
+            print(outputs[names[emitted]], end='')
+            emitted += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+            frame_dir.cleanup()
+    
+    return results
+
+def main(data_path='./', refresh_cache=False, compact=False, workers=None, use_stage_cache=True,
+         dashboard_dir=None, dashboard_format='png', backend='pandas', n_resamples=0,
+         resample_workers=None):
+    """Execute the complete Lahman baseball analysis pipeline."""
     
-    # Lineup optimization
-    optimal_lineup = optimize_lineup_production(df)
+    print("⚾ LAHMAN BASEBALL DATABASE ANALYSIS PROJECT ⚾")
+    print("=" * 60)
     
-    # Create visualizations
-    create_comprehensive_visualizations(df, yearly_stats, career_stats, age_performance)
+    min_year, min_ab = 1980, 50
+    stages = PIPELINE_STAGES
+    
+    if backend != 'pandas':
+        # Load, preprocess and aggregate as one lazy plan over the Parquet cache
+        if compact:
+            print(f"Note: --compact applies to the pandas backend only; ignored for {backend}")
+        try:
+            tables = lazy_pipeline_tables(data_path, backend, min_year=min_year, min_ab=min_ab,
+                                          refresh_cache=refresh_cache)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"Could not load data with the {backend} backend: {e}. Exiting...")
+            return
+        
+        df = tables['df']
+        print(f"✅ Loaded {len(df):,} player-seasons with the {backend} backend")
+        stages = _replace_stage(stages, 'league', functools.partial(_precomputed_stage, result=tables['league']))
+        stages = _replace_stage(stages, 'career_table',
+                                functools.partial(_precomputed_stage, result=tables['career_table']))
+    else:
+        # Load data
+        batting, people, teams = load_lahman_data(data_path, refresh_cache=refresh_cache, compact=compact,
+                                                  min_year=min_year, min_ab=min_ab,
+                                                  columns=BATTING_COLUMNS)
+        
+        if batting is None:
+            print("Could not load data. Exiting...")
+            return
+        
+        # Preprocess data
+        df = preprocess_batting_data(batting, people, teams, min_year=min_year, min_ab=min_ab, compact=compact)
+    
+    # HOF labels for the trained model, persisted next to the Parquet cache
+    hall_of_fame = load_hall_of_fame(data_path)
+    if hall_of_fame is not None:
+        stages = _replace_stage(stages, 'hof_analysis', functools.partial(
+            predict_hall_of_fame_candidates, hall_of_fame=hall_of_fame,
+            model_dir=f'{data_path}{CACHE_DIR_NAME}/models'))
+    
+    # Bootstrap/permutation inference is opt-in: it dominates the run time
+    if n_resamples:
+        stages = _replace_stage(stages, 'statistical_tests', functools.partial(
+            perform_statistical_tests, n_resamples=n_resamples, workers=resample_workers))
+    
+    # Analysis stages (independent stages run concurrently unless workers=1)
+    stage_cache_dir = f'{data_path}{CACHE_DIR_NAME}/stages' if use_stage_cache else None
+    stage_results = run_pipeline_stages(df, stages=stages, workers=workers, cache_dir=stage_cache_dir)
+    yearly_stats = stage_results['yearly_stats']
+    career_stats = stage_results['career_stats']
+    age_performance = stage_results['age_performance']
+    
+    # Create visualizations (headless panel files when dashboard_dir is set)
+    create_comprehensive_visualizations(df, yearly_stats, career_stats, age_performance,
+                                        output_dir=dashboard_dir, fmt=dashboard_format,
+                                        workers=workers)
     
     # Final summary report
     print(f"\n{'='*80}")
@@ -904,58 +2984,212 @@ def main():
 # 1️⃣2️⃣ Additional Analysis Functions
 # ------------------------------------------------------------------
 
-def find_statistical_outliers(df):
-    """Identify statistical outliers and anomalies in the data."""
+OUTLIER_METRICS = ['OPS', 'HR', 'RBI', 'BB_rate', 'K_rate']
+
+# Scale factor that makes the MAD consistent with the standard deviation
+MAD_SCALE = 0.6745
+
+def _outlier_groups(df, group_by):
+    """Group keys for outlier scoring: None, 'season', 'decade' or a column."""
+    
+    if group_by is None:
+        return None
+    if group_by == 'season':
+        return df['yearID']
+    if group_by == 'decade':
+        return (df['yearID'] // 10 * 10).rename('decade')
+    return df[group_by]
+
+def outlier_scores(df, metrics=None, min_ab=200, group_by=None):
+    
+    """
+    Z-scores and robust MAD-scores for every metric in one pass.
+    
+    Scores are computed against the qualified (AB >= min_ab) population,
+    or within each season/decade/column group via groupby.transform.
+    Returns a tidy frame: one row per (player-season, metric) with the
+    value, z_score and mad_score, indexed like df.
+    """
+    
+    if metrics is None:
+        metrics = OUTLIER_METRICS
+    metrics = [m for m in metrics if m in df.columns]
+    
+    qualified = df.loc[df['AB'] >= min_ab, metrics].astype(float)
+    keys = _outlier_groups(df.loc[qualified.index], group_by)
+    
+    if keys is None:
+        mean, std = qualified.mean(), qualified.std(ddof=0)
+        median = qualified.median()
+        mad = (qualified - median).abs().median()
+    else:
+        grouped = qualified.groupby(keys, observed=True)
+        mean, std = grouped.transform('mean'), grouped.transform('std', ddof=0)
+        median = grouped.transform('median')
+        mad = (qualified - median).abs().groupby(keys, observed=True).transform('median')
+    
+    # Constant groups (zero spread) get no score rather than +/-inf
+    z_scores = (qualified - mean) / std.replace(0, np.nan)
+    mad_scores = MAD_SCALE * (qualified - median) / mad.replace(0, np.nan)
+    
+    long = pd.DataFrame({
+        'metric': np.tile(metrics, len(qualified)),
+        'value': qualified.to_numpy().ravel(),
+        'z_score': z_scores.to_numpy().ravel(),
+        'mad_score': mad_scores.to_numpy().ravel(),
+    }, index=qualified.index.repeat(len(metrics)))
+    
+    return long[long['value'].notna()]
+
+def find_statistical_outliers(df, metrics=None, min_ab=200, threshold=3,
+                              score='z_score', group_by=None, show=5):
+    
+    """
+    Identify statistical outliers and anomalies in the data.
+    
+    Flags qualified player-seasons whose |score| exceeds threshold, where
+    score is 'z_score' or the robust 'mad_score', optionally within
+    season or decade groups. Returns the tidy outlier table (playerID,
+    yearID, fullName, metric, value, z_score, mad_score).
+    """
     
     print(f"\n{'='*60}")
     print("STATISTICAL OUTLIERS ANALYSIS")
     print('='*60)
     
-    # Define metrics to check for outliers
-    metrics = ['OPS', 'HR', 'RBI', 'BB_rate', 'K_rate']
+    scores = outlier_scores(df, metrics, min_ab, group_by)
+    flagged = scores[scores[score].abs() > threshold]
     
-    for metric in metrics:
-        if metric not in df.columns:
-            continue
-            
-        data = df[df['AB'] >= 200][metric].dropna()  # Qualified players only
-        
-        # Calculate z-scores
-        z_scores = np.abs(stats.zscore(data))
-        outlier_threshold = 3  # 3 standard deviations
+    # Metric order first, then original row order within each metric
+    order = {metric: i for i, metric in enumerate(dict.fromkeys(scores['metric']))}
+    flagged = flagged.iloc[np.argsort(flagged['metric'].map(order).to_numpy(), kind='stable')]
+    
+    info = df.loc[flagged.index, ['playerID', 'yearID']]
+    info['fullName'] = df.loc[flagged.index, 'fullName'] if 'fullName' in df.columns else info['playerID']
+    outliers = pd.concat([info, flagged], axis=1)
+    
+    label = 'z-score' if score == 'z_score' else 'MAD-score'
+    scope = f" within {group_by}" if group_by else ""
+    for metric, rows in outliers.groupby('metric', sort=False):
+        print(f"\n{metric} Outliers (|{label}| > {threshold}{scope}):")
+        print("-" * 40)
         
-        outliers = df.loc[data.index[z_scores > outlier_threshold]]
+        for outlier in rows.head(show).itertuples():
+            print(f"  {outlier.fullName:25s} {outlier.yearID} - "
+                  f"{metric}: {outlier.value:.3f} ({label}: {getattr(outlier, score):+.2f})")
+    
+    return outliers.reset_index(drop=True)
+
+def year_over_year_pairs(df, max_lag=3, min_ab=300):
+    
+    """
+    Row positions of every (season t, season t+k) pair, k = 1..max_lag,
+    among qualified player-seasons.
+    
+    Split seasons are first combined into one row per player-season.
+    Rows are then sorted once by (playerID, yearID) and pairs found by
+    comparing the sorted player and year arrays against themselves at
+    offsets 1..k (a k-season gap is at most k rows ahead), so no groupby
+    is needed. Returns the qualified frame in sorted order and
+    {lag: (first_positions, second_positions)}.
+    """
+    
+    seasons = combine_stints(df)
+    qualified = seasons[seasons['AB'] >= min_ab]
+    player_codes = pd.factorize(qualified['playerID'])[0]
+    years = qualified['yearID'].to_numpy(np.int64)
+    order = np.lexsort((years, player_codes))
+    qualified = qualified.iloc[order]
+    player_codes, years = player_codes[order], years[order]
+    
+    pairs = {}
+    for lag in range(1, max_lag + 1):
+        firsts, seconds = [], []
+        for offset in range(1, min(lag, len(years) - 1) + 1):
+            hit = ((player_codes[offset:] == player_codes[:-offset]) &
+                   (years[offset:] - years[:-offset] == lag))
+            first = np.flatnonzero(hit)
+            firsts.append(first)
+            seconds.append(first + offset)
+        pairs[lag] = (np.concatenate(firsts) if firsts else np.empty(0, np.int64),
+                      np.concatenate(seconds) if seconds else np.empty(0, np.int64))
+    
+    return qualified, pairs
+
+def stability_matrix(df, metrics=None, max_lag=3, min_ab=300):
+    
+    """
+    Year-over-year reliability of each metric at lags 1..max_lag.
+    
+    For each metric x lag, over qualified pairs (x_t, x_t+k):
+    - correlation: Pearson r
+    - slope: least-squares slope of x_t+k on x_t
+    - regression: 1 - slope, the share of a deviation from the mean
+      expected to disappear after k seasons
+    - pairs: number of pairs used
+    
+    All metrics are handled together as 2-D arrays. Returns a dict of
+    metric x lag DataFrames plus the sorted frame and pair positions.
+    """
+    
+    if metrics is None:
+        metrics = RATE_STATS
+    metrics = [m for m in metrics if m in df.columns]
+    
+    qualified, pairs = year_over_year_pairs(df, max_lag, min_ab)
+    values = qualified[metrics].to_numpy(np.float64)
+    
+    result = {name: pd.DataFrame(np.nan, index=pd.Index(metrics, name='metric'),
+                                 columns=pd.Index(list(pairs), name='lag'))
+              for name in ['correlation', 'slope', 'regression', 'pairs']}
+    
+    for lag, (first, second) in pairs.items():
+        x, y = values[first], values[second]
+        valid = ~(np.isnan(x) | np.isnan(y))
+        n = valid.sum(axis=0)
+        x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
         
-        if len(outliers) > 0:
-            print(f"\n{metric} Outliers (|z-score| > {outlier_threshold}):")
-            print("-" * 40)
-            
-            for _, outlier in outliers.head(5).iterrows():
-                name = outlier.get('fullName', outlier['playerID'])
-                z_score = (outlier[metric] - data.mean()) / data.std()
-                print(f"  {name:25s} {outlier['yearID']} - "
-                      f"{metric}: {outlier[metric]:.3f} (z-score: {z_score:+.2f})")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_mean, y_mean = x.sum(axis=0) / n, y.sum(axis=0) / n
+            x_dev, y_dev = (x - x_mean) * valid, (y - y_mean) * valid
+            cov = (x_dev * y_dev).sum(axis=0)
+            x_var, y_var = (x_dev ** 2).sum(axis=0), (y_dev ** 2).sum(axis=0)
+            slope = cov / x_var
+            result['correlation'][lag] = cov / np.sqrt(x_var * y_var)
+        result['slope'][lag] = slope
+        result['regression'][lag] = 1 - slope
+        result['pairs'][lag] = n
+    
+    result['pairs'] = result['pairs'].astype(int)
+    result['qualified'] = qualified
+    result['lag_pairs'] = pairs
+    return result
 
-def regression_to_mean_analysis(df):
-    """Analyze regression to the mean in player performance."""
+def regression_to_mean_analysis(df, metrics=None, max_lag=3, min_ab=300):
+    
+    """
+    Analyze regression to the mean in player performance.
+    
+    Reports the OPS decile analysis for consecutive seasons and the
+    metric x lag reliability matrix from stability_matrix, which is
+    returned.
+    """
+    
+    from scipy import stats
     
     print(f"\n{'='*60}")
     print("REGRESSION TO THE MEAN ANALYSIS")
     print('='*60)
     
-    # Find players with consecutive qualified seasons
-    qualified = df[df['AB'] >= 300].copy()
-    qualified = qualified.sort_values(['playerID', 'yearID'])
+    stability = stability_matrix(df, metrics, max_lag, min_ab)
+    qualified = stability['qualified']
+    first, second = stability['lag_pairs'][1]
     
-    # Calculate year-over-year changes
-    qualified['next_year'] = qualified.groupby('playerID')['yearID'].shift(-1)
-    qualified['next_ops'] = qualified.groupby('playerID')['OPS'].shift(-1)
-    
-    # Filter for consecutive seasons
-    consecutive = qualified[
-        (qualified['next_year'] == qualified['yearID'] + 1) &
-        qualified['next_ops'].notna()
-    ].copy()
+    # Consecutive qualified seasons
+    consecutive = pd.DataFrame({
+        'OPS': qualified['OPS'].to_numpy()[first],
+        'next_ops': qualified['OPS'].to_numpy()[second],
+    }).dropna()
     
     if len(consecutive) > 50:
         # Analyze extreme performers in year 1
@@ -976,14 +3210,47 @@ def regression_to_mean_analysis(df):
         # Correlation between extreme performance and next year
         corr, p_val = stats.pearsonr(consecutive['OPS'], consecutive['next_ops'])
         print(f"Year-to-year OPS correlation: {corr:.3f} (p-value: {p_val:.6f})")
+    
+    print("\nYear-over-Year Reliability (r, regression toward mean in parentheses):")
+    print("-" * 30)
+    lags = list(stability['correlation'].columns)
+    print(f"{'Metric':10s}" + "".join(f"{'lag ' + str(lag):>16s}" for lag in lags))
+    for metric in stability['correlation'].index:
+        cells = [f"{stability['correlation'].at[metric, lag]:.3f} ({stability['regression'].at[metric, lag]:.2f})"
+                 for lag in lags]
+        print(f"{metric:10s}" + "".join(f"{cell:>16s}" for cell in cells))
+    print(f"{'pairs':10s}" + "".join(f"{stability['pairs'].iloc[0][lag]:>16,d}" for lag in lags))
+    
+    return {name: stability[name] for name in ['correlation', 'slope', 'regression', 'pairs']}
 
 # ------------------------------------------------------------------
 # 1️⃣3️⃣ Execute Analysis
 # ------------------------------------------------------------------
 
-if __name__ == "__main__":
-    # Run main analysis
-    results = main()
+# Subcommands handled by the fast-start query CLI (section 1️⃣6️⃣) instead
+# of the full pipeline
+QUERY_COMMANDS = ('lookup', 'team', 'similar', 'check-imports', 'serve', 'generate', 'benchmark')
+
+if __name__ == "__main__" and sys.argv[1:2] not in [[command] for command in QUERY_COMMANDS]:
+    # Run main analysis (--refresh-cache rebuilds the Parquet cache,
+    # --compact loads with the compact dtype schema, --sequential runs
+    # the stages in this process, --no-stage-cache recomputes every stage,
+    # --headless renders dashboard panels to ./dashboard, --svg as SVG,
+    # --backend polars|duckdb loads and aggregates with a lazy query engine,
+    # --resamples N adds bootstrap/permutation inference with N resamples
+    # on --resample-workers processes)
+    option = lambda flag, default: sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv[:-1] else default
+    backend = option('--backend', 'pandas')
+    resample_workers = option('--resample-workers', None)
+    results = main(refresh_cache='--refresh-cache' in sys.argv,
+                   compact='--compact' in sys.argv,
+                   workers=1 if '--sequential' in sys.argv else None,
+                   use_stage_cache='--no-stage-cache' not in sys.argv,
+                   dashboard_dir='./dashboard' if '--headless' in sys.argv else None,
+                   dashboard_format='svg' if '--svg' in sys.argv else 'png',
+                   backend=backend,
+                   n_resamples=int(option('--resamples', 0)),
+                   resample_workers=None if resample_workers is None else int(resample_workers))
     
     if results and results[0] is not None:
         df, career_stats, yearly_stats = results
@@ -1009,14 +3276,96 @@ if __name__ == "__main__":
 # 1️⃣4️⃣ Utility Functions for Custom Analysis
 # ------------------------------------------------------------------
 
-def custom_player_lookup(df, player_name_partial):
-    """Look up specific player statistics."""
+def _fold_name(name):
+    """Lowercase and strip accents so 'jose' finds 'José'."""
+    
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+def build_name_index(df):
+    
+    """
+    Build a player-name search index over the season table.
+    
+    Names are accent-folded and lowercased once per player; every 1-3
+    character gram of a name has a postings array of player positions.
+    Lookups intersect the postings of the query's trigrams (or the whole
+    query when it is shorter), confirm the substring on the few candidates
+    and gather each hit's season rows from a precomputed row grouping.
+    The index keeps a reference to df and must be rebuilt if df changes.
+    """
+    
+    codes, player_ids = pd.factorize(df['playerID'])
+    order = np.argsort(codes, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(player_ids)))])
+    
+    full_names = df['fullName'].to_numpy()[order[starts[:-1]]]
+    names = ['' if pd.isna(name) else _fold_name(str(name)) for name in full_names]
+    has_name = np.array([not pd.isna(name) for name in full_names])
+    
+    postings = {}
+    for pos, name in enumerate(names):
+        grams = {name[i:i + n] for n in (1, 2, 3) for i in range(len(name) - n + 1)}
+        for gram in grams:
+            postings.setdefault(gram, []).append(pos)
+    
+    return {
+        'df': df,
+        'player_ids': player_ids,
+        'names': names,
+        'has_name': has_name,
+        'postings': {gram: np.array(players) for gram, players in postings.items()},
+        'row_order': order,
+        'row_starts': starts
+    }
+
+def lookup_players(name_index, player_name_partial):
+    
+    """
+    Return the season rows of every player whose name contains the query.
+    
+    Matches df['fullName'].str.contains(query, case=False, regex=False)
+    with accent folding, and keeps the rows in df order.
+    """
+    
+    query = _fold_name(player_name_partial)
+    names = name_index['names']
+    
+    if query:
+        grams = {query[i:i + 3] for i in range(len(query) - 2)} or {query}
+        postings = sorted((name_index['postings'].get(gram, np.empty(0, dtype=int)) for gram in grams),
+                          key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        hits = [pos for pos in candidates if query in names[pos]]
+    else:
+        hits = np.flatnonzero(name_index['has_name'])
+    
+    order, starts = name_index['row_order'], name_index['row_starts']
+    rows = [order[starts[pos]:starts[pos + 1]] for pos in hits]
+    rows = np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=int)
+    return name_index['df'].iloc[rows]
+
+def custom_player_lookup(df, player_name_partial, career_table=None, name_index=None):
+    
+    """
+    Look up specific player statistics.
+    
+    Names match as in lookup_players (case-insensitive, accent-folded
+    substring). Pass a name_index from build_name_index(df) to reuse it
+    across calls; otherwise a one-off index is built.
+    """
     
     if 'fullName' not in df.columns:
         print("Player names not available in dataset")
         return None
     
-    matches = df[df['fullName'].str.contains(player_name_partial, case=False, na=False)]
+    if name_index is None:
+        name_index = build_name_index(df)
+    matches = lookup_players(name_index, player_name_partial)
     
     if len(matches) == 0:
         print(f"No players found matching: {player_name_partial}")
@@ -1025,42 +3374,124 @@ def custom_player_lookup(df, player_name_partial):
     print(f"\nPlayer Lookup Results for '{player_name_partial}':")
     print("-" * 50)
     
-    for player_id in matches['playerID'].unique():
-        player_seasons = matches[matches['playerID'] == player_id].sort_values('yearID')
-        player_name = player_seasons['fullName'].iloc[0]
-        
-        print(f"\n{player_name}:")
-        print(f"  Career: {player_seasons['yearID'].min()} - {player_seasons['yearID'].max()}")
-        print(f"  Seasons: {len(player_seasons)}")
-        print(f"  Career Totals: {player_seasons['H'].sum()} H, {player_seasons['HR'].sum()} HR, {player_seasons['RBI'].sum()} RBI")
-        print(f"  Career Rates: {player_seasons['AVG'].mean():.3f} AVG, {player_seasons['OPS'].mean():.3f} OPS")
+    for _, career in player_summaries(matches, career_table).iterrows():
+        print(f"\n{career['name']}:")
+        print(f"  Career: {career['debut_year']} - {career['final_year']}")
+        print(f"  Seasons: {career['seasons']}")
+        print(f"  Career Totals: {career['H_sum']} H, {career['HR_sum']} HR, {career['RBI_sum']} RBI")
+        print(f"  Career Rates: {career['AVG_mean']:.3f} AVG, {career['OPS_mean']:.3f} OPS")
         
         # Best season
-        best_season = player_seasons.loc[player_seasons['OPS'].idxmax()]
-        print(f"  Best Season: {best_season['yearID']} - {best_season['OPS']:.3f} OPS")
+        print(f"  Best Season: {career['best_year']} - {career['best_OPS']:.3f} OPS")
     
     return matches
 
-def team_analysis(df, team_id, start_year=None, end_year=None):
-    """Analyze a specific team's offensive performance over time."""
+def player_comparables(df, player, k=10, min_career_ab=1000, career_table=None, name_index=None):
     
-    if 'teamID' not in df.columns:
-        print("Team information not available in dataset")
+    """
+    Print the k careers most similar to player (a playerID or part of a
+    name; for a name the matching player with the most at-bats is used).
+    Returns the similar_players table, or None.
+    """
+    
+    if career_table is None:
+        career_table = build_career_table(df)
+    
+    player_id = player
+    if player not in career_table.index:
+        if name_index is None:
+            name_index = build_name_index(df)
+        matches = lookup_players(name_index, player)
+        if len(matches) == 0:
+            print(f"No players found matching: {player}")
+            return None
+        player_id = career_table.loc[matches['playerID'].unique(), 'AB_sum'].idxmax()
+    
+    try:
+        comparables = similar_players(player_id, k, comparables_index(career_table, min_career_ab))
+    except KeyError:
+        print(f"{career_table.loc[player_id, 'name']} has fewer than {min_career_ab} career AB")
         return None
     
-    team_data = df[df['teamID'] == team_id].copy()
+    print(f"\nCareers Most Similar to {career_table.loc[player_id, 'name']} ({player_id}):")
+    print("-" * 70)
+    print(f"{'Player':25s} {'Dist':>5s} {'AVG':>5s} {'OPS':>5s} {'HR%':>5s} {'BB%':>5s} {'Yrs':>4s} {'AB':>6s}")
+    for _, comp in comparables.iterrows():
+        print(f"{comp['name']:25s} {comp['distance']:5.2f} {comp['career_AVG']:5.3f} {comp['OPS_mean']:5.3f} "
+              f"{comp['career_HR_rate']:5.1%} {comp['career_BB_rate']:5.1%} {comp['seasons']:4.0f} "
+              f"{comp['AB_sum']:6.0f}")
     
-    if start_year:
-        team_data = team_data[team_data['yearID'] >= start_year]
-    if end_year:
-        team_data = team_data[team_data['yearID'] <= end_year]
+    return comparables
+
+def player_summaries(matches, career_table=None):
+    
+    """
+    Career line and best (highest-OPS) season for each player in matches,
+    indexed by playerID in first-appearance order.
+    """
+    
+    player_ids = matches['playerID'].unique()
+    if career_table is None:
+        career_table = build_career_table(matches)
+    careers = career_table.loc[player_ids, ['name', 'debut_year', 'final_year', 'seasons',
+                                            'H_sum', 'HR_sum', 'RBI_sum', 'AVG_mean', 'OPS_mean']]
+    
+    # Best season per player in one pass instead of per-player filtering
+    best_seasons = matches.loc[matches.groupby('playerID', observed=True)['OPS'].idxmax().dropna()]
+    best_seasons = best_seasons.set_index('playerID')[['yearID', 'OPS']]
+    summaries = careers.join(best_seasons.rename(columns={'yearID': 'best_year', 'OPS': 'best_OPS'}))
+    summaries['best_year'] = summaries['best_year'].astype('Int64')
+    return summaries
+
+def build_team_index(df):
+    
+    """
+    Sort the season table by (teamID, yearID) for team_analysis.
+    
+    The sorted MultiIndex turns a team/year-range selection into a
+    binary-search slice instead of masking the whole frame. Build it once
+    and pass it to every team_analysis call.
+    """
+    
+    return df.set_index(['teamID', 'yearID'], drop=False).sort_index()
+
+def _team_table(rollup):
+    """The team_analysis columns from a cube roll-up."""
+    return rollup[['AVG', 'OBP', 'SLG', 'OPS', 'HR', 'RBI']].assign(playerID=rollup['players']).round(3)
+
+def team_seasons(df, team_id, start_year=None, end_year=None, team_index=None, cube=None):
+    
+    """
+    Yearly aggregates for one team (the team_analysis table), or None if
+    no rows. With cube (build_aggregate_cube) the table is rolled up from
+    its cells instead of the player-seasons.
+    """
+    
+    if cube is not None:
+        rollup = cube_rollup(cube, ['yearID'], {'teamID': team_id,
+                                                'yearID': (start_year or None, end_year or None)},
+                             pooled=False)
+        return _team_table(rollup) if len(rollup) else None
+    
+    if team_index is not None:
+        years = slice(start_year or None, end_year or None)
+        try:
+            team_data = team_index.loc[pd.IndexSlice[team_id, years], :].reset_index(drop=True)
+        except KeyError:
+            team_data = team_index.iloc[:0].reset_index(drop=True)
+    else:
+        team_data = df[df['teamID'] == team_id].copy()
+        
+        if start_year:
+            team_data = team_data[team_data['yearID'] >= start_year]
+        if end_year:
+            team_data = team_data[team_data['yearID'] <= end_year]
     
     if len(team_data) == 0:
-        print(f"No data found for team: {team_id}")
         return None
     
     # Calculate team yearly stats
-    team_yearly = team_data.groupby('yearID').agg({
+    return team_data.groupby('yearID').agg({
         'AVG': 'mean',
         'OBP': 'mean',
         'SLG': 'mean', 
@@ -1069,6 +3500,19 @@ def team_analysis(df, team_id, start_year=None, end_year=None):
         'RBI': 'sum',
         'playerID': 'count'
     }).round(3)
+
+def team_analysis(df, team_id, start_year=None, end_year=None, team_index=None, cube=None):
+    """Analyze a specific team's offensive performance over time."""
+    
+    if 'teamID' not in df.columns:
+        print("Team information not available in dataset")
+        return None
+    
+    team_yearly = team_seasons(df, team_id, start_year, end_year, team_index, cube)
+    
+    if team_yearly is None:
+        print(f"No data found for team: {team_id}")
+        return None
     
     print(f"\n{team_id} Team Analysis:")
     print("-" * 30)
@@ -1079,8 +3523,122 @@ def team_analysis(df, team_id, start_year=None, end_year=None):
     
     return team_yearly
 
+def team_yearly_summary(df, start_year=None, end_year=None, cube=None):
+    
+    """
+    Per-team yearly aggregates for every team in one groupby, or rolled
+    up from cube (build_aggregate_cube) when given.
+    
+    Returns the same columns as team_analysis, indexed by (teamID, yearID).
+    """
+    
+    if cube is not None:
+        return _team_table(cube_rollup(cube, ['teamID', 'yearID'],
+                                       {'yearID': (start_year or None, end_year or None)}, pooled=False))
+    
+    if start_year:
+        df = df[df['yearID'] >= start_year]
+    if end_year:
+        df = df[df['yearID'] <= end_year]
+    
+    return df.groupby(['teamID', 'yearID'], observed=True).agg({
+        'AVG': 'mean',
+        'OBP': 'mean',
+        'SLG': 'mean', 
+        'OPS': 'mean',
+        'HR': 'sum',
+        'RBI': 'sum',
+        'playerID': 'count'
+    }).round(3)
+
+# Aggregate cube: additive aggregates at the year x team x league grain.
+# Player-rate means roll up as (sum, count) pairs; pooled rates are
+# derived from the summed counting stats with the metric registry
+CUBE_DIMENSIONS = ['yearID', 'teamID', 'lgID']
+CUBE_SUMS = ['G', 'AB', 'R', 'H', '2B', '3B', 'HR', 'RBI', 'SB', 'BB', 'SO', 'HBP', 'SH', 'SF']
+CUBE_POOLED = ['AVG', 'OBP', 'SLG', 'OPS', 'ISO', 'BB_rate', 'K_rate', 'HR_rate', 'wOBA', 'BABIP']
+
+def build_aggregate_cube(df, dimensions=CUBE_DIMENSIONS):
+    
+    """
+    Additive aggregates of the season table at the finest grain of
+    dimensions, in one groupby.
+    
+    Each cell holds players (row count), the sum of every CUBE_SUMS
+    column and, for each RATE_STATS metric, its sum and non-missing count
+    (<metric>_sum, <metric>_n). Everything is additive, so cube_rollup can
+    answer any coarser slice from the cells alone.
+    """
+    
+    dimensions = [dim for dim in dimensions if dim in df.columns]
+    sums = [col for col in CUBE_SUMS if col in df.columns]
+    rates = [metric for metric in RATE_STATS if metric in df.columns]
+    
+    # Sums are kept in 64 bits; compact int16/float32 columns would overflow or round
+    values = {dim: df[dim] for dim in dimensions}
+    values['players'] = np.ones(len(df), dtype=np.int64)
+    for col in sums:
+        values[col] = df[col].to_numpy(np.int64 if df[col].dtype.kind in 'iub' else np.float64)
+    for metric in rates:
+        values[f'{metric}_sum'] = df[metric].to_numpy(np.float64)
+        values[f'{metric}_n'] = df[metric].notna().to_numpy(np.int64)
+    
+    return pd.DataFrame(values, index=df.index).groupby(dimensions, observed=True, dropna=False).sum()
+
+def cube_rollup(cube, by=('yearID',), where=None, pooled=True):
+    
+    """
+    Roll the aggregate cube up to the dimensions in by (empty for a grand
+    total) without touching player-level rows.
+    
+    where restricts cells before rolling up: {dimension: value, list of
+    values, or (low, high) inclusive range with None for an open end}.
+    
+    Returns players, the summed counting stats, each player-rate mean
+    under its own name (what a groupby mean over the seasons gives) and,
+    with pooled, rates from the sums as <metric>_pooled.
+    """
+    
+    # Conditions are tested once per distinct level value, then spread to
+    # the cells through the index codes
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, condition in (where or {}).items():
+        position = cube.index.names.index(dim)
+        level, codes = cube.index.levels[position], cube.index.codes[position]
+        if isinstance(condition, tuple):
+            low, high = condition
+            keep = np.ones(len(level), dtype=bool)
+            if low is not None:
+                keep &= np.asarray(level >= low)
+            if high is not None:
+                keep &= np.asarray(level <= high)
+        else:
+            values = list(condition) if isinstance(condition, (list, set, np.ndarray, pd.Index)) else [condition]
+            keep = np.asarray(level.isin(values))
+        mask &= keep[codes] & (codes >= 0)
+    cells = cube[mask]
+    
+    by = list(by)
+    if by:
+        totals = cells.groupby(level=by, observed=True, dropna=False).sum()
+    else:
+        totals = cells.sum().to_frame().T.astype(cells.dtypes)
+    
+    rates = [col[:-len('_sum')] for col in totals.columns if col.endswith('_sum')]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = (totals[[f'{metric}_sum' for metric in rates]].to_numpy()
+                 / totals[[f'{metric}_n' for metric in rates]].to_numpy())
+    parts = [totals.drop(columns=[col for col in totals.columns if col.endswith(('_sum', '_n'))]),
+             pd.DataFrame(means, index=totals.index, columns=rates)]
+    
+    if pooled:
+        available = set(totals.columns)
+        derivable = [metric for metric in CUBE_POOLED if set(_metric_plan([metric])[1]) <= available]
+        parts.append(compute_metrics(totals, derivable).add_suffix('_pooled'))
+    return pd.concat(parts, axis=1)
+
 # Example usage functions for demonstration
-def run_example_analyses(df):
+def run_example_analyses(df, career_table=None):
     """Run some example analyses to demonstrate functionality."""
     
     print(f"\n{'='*60}")
@@ -1088,9 +3646,10 @@ def run_example_analyses(df):
     print('='*60)
     
     # Example 1: Look up a famous player (if data exists)
+    name_index = build_name_index(df) if 'fullName' in df.columns else None
     famous_players = ['Babe Ruth', 'Ted Williams', 'Barry Bonds', 'Willie Mays']
     for player in famous_players:
-        result = custom_player_lookup(df, player)
+        result = custom_player_lookup(df, player, career_table, name_index)
         if result is not None:
             break  # Found one, that's enough for demo
     
@@ -1103,10 +3662,917 @@ def run_example_analyses(df):
                 break
 
     print(f"\n💡 You can now run custom analyses:")
-    print(f"   - custom_player_lookup(df, 'Player Name')")
-    print(f"   - team_analysis(df, 'TEAM_ID', start_year, end_year)")
+    print(f"   - custom_player_lookup(df, 'Player Name', career_table, build_name_index(df))")
+    print(f"   - team_analysis(df, 'TEAM_ID', start_year, end_year, build_team_index(df))")
+    print(f"   - team_yearly_summary(df, start_year, end_year) for every team at once")
+    print(f"   - cube_rollup(build_aggregate_cube(df), by, where) for any year/team/league slice")
     print(f"   - Access the processed dataframe as 'df' for your own analysis")
 
+# ------------------------------------------------------------------
+# 1️⃣5️⃣ Incremental Season Ingestion
+# ------------------------------------------------------------------
+
+def build_pipeline_state(df, people=None):
+    
+    """
+    Materialize the derived tables that ingest_season keeps up to date:
+    the season table, career table, league-season aggregates,
+    era-adjusted columns and the year x team x league aggregate cube.
+    """
+    
+    league = league_season_aggregates(df)
+    return {
+        'df': df,
+        'people': people,
+        'career_table': build_career_table(df),
+        'league': league,
+        'era': era_adjusted_columns(df, league),
+        'cube': build_aggregate_cube(df)
+    }
+
+def _append_rows(old, new):
+    """Concatenate season frames, keeping categorical columns categorical."""
+    
+    combined = pd.concat([old, new], ignore_index=True)
+    for col in old.columns:
+        if isinstance(old[col].dtype, pd.CategoricalDtype) and col in new.columns:
+            combined[col] = pd.Series(
+                union_categoricals([old[col], new[col].astype('category')]), index=combined.index
+            )
+    return combined
+
+def ingest_season(state, batting_season, people_season=None, min_year=1950, min_ab=100, compact=False):
+    
+    """
+    Append newly published Batting (and People) rows to a pipeline state.
+    
+    Only the new rows go through preprocess_batting_data. Career rows are
+    rebuilt for the players who appear in them, league aggregates and era
+    adjustments for the seasons they touch, and the new rows' aggregate
+    cells are added into the cube; everything else is carried over.
+    Returns a new state; the input state is left unchanged.
+    """
+    
+    print(f"\nIngesting {len(batting_season)} new batting rows...")
+    
+    people = state['people']
+    if people_season is not None:
+        people = (pd.concat([people, people_season], ignore_index=True)
+                  .drop_duplicates('playerID', keep='last') if people is not None else people_season)
+    
+    new_rows = preprocess_batting_data(batting_season, people, None, min_year, min_ab, compact)
+    if len(new_rows) == 0:
+        return {**state, 'people': people}
+    
+    df = _append_rows(state['df'], new_rows)
+    added = np.zeros(len(df), dtype=bool)
+    added[len(state['df']):] = True
+    
+    # Career rows of the players in the new season
+    players = new_rows['playerID'].unique()
+    player_rows = df['playerID'].isin(players).to_numpy()
+    career_table = pd.concat([
+        state['career_table'].drop(index=players, errors='ignore'),
+        build_career_table(df[player_rows])
+    ]).sort_index()
+    
+    # League aggregates and era adjustments of the seasons touched
+    years = new_rows['yearID'].unique()
+    year_rows = df['yearID'].isin(years).to_numpy()
+    league = pd.concat([
+        state['league'].drop(index=years, errors='ignore'),
+        _aggregate_league_seasons(df[year_rows])
+    ]).sort_index()
+    _remember_league_aggregates(df, league)
+    
+    era = pd.concat([
+        state['era'][~year_rows[~added]],
+        era_adjusted_columns(df[year_rows], league)
+    ]).sort_index()
+    
+    # Cube cells are additive, so the new rows' cells are summed into them
+    cube = pd.concat([state['cube'], build_aggregate_cube(new_rows)]).groupby(
+        level=list(state['cube'].index.names), observed=True, dropna=False).sum()
+    
+    print(f"Updated {len(players)} careers and {len(years)} league season(s); "
+          f"{len(df)} player-seasons total")
+    
+    return {'df': df, 'people': people, 'career_table': career_table,
+            'league': league, 'era': era, 'cube': cube}
+
+def _frames_match(left, right, rtol=1e-6):
+    
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, check_categorical=False,
+                                      check_index_type=False, check_column_type=False, rtol=rtol)
+        return None
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+
+def check_incremental_consistency(state, batting, people, teams, min_year=1950, min_ab=100,
+                                  compact=False):
+    
+    """
+    Compare an incrementally updated state with a full rebuild from the raw tables.
+    
+    Prints one line per derived table and returns True when all match.
+    """
+    
+    print("\nChecking incremental state against a full rebuild...")
+    
+    full = build_pipeline_state(
+        preprocess_batting_data(batting, people, teams, min_year, min_ab, compact), people
+    )
+    
+    # Row order can differ (appended vs. source order); compare on a canonical
+    # order, sorting categoricals by value since their category order differs too
+    def by_value(col):
+        return col.astype(str) if isinstance(col.dtype, pd.CategoricalDtype) else col
+    
+    def canonical(s):
+        order = s['df'].sort_values(['playerID', 'yearID', 'stint'], key=by_value).index
+        return {
+            'df': s['df'].loc[order].reset_index(drop=True),
+            'era': s['era'].loc[order].reset_index(drop=True),
+            'career_table': s['career_table'].sort_index(),
+            'league': s['league'],
+            'cube': s['cube'].sort_index(key=by_value)
+        }
+    
+    incremental, rebuilt = canonical(state), canonical(full)
+    consistent = True
+    for name in ['df', 'career_table', 'league', 'era', 'cube']:
+        problem = _frames_match(incremental[name], rebuilt[name])
+        consistent &= problem is None
+        print(f"  {'✓' if problem is None else '✗'} {name}" + (f": {problem}" if problem else ''))
+    
+    return consistent
+
+# ------------------------------------------------------------------
+# 1️⃣6️⃣ Fast-Start Query Mode
+# ------------------------------------------------------------------
+
+# Importing this module should cost little more than numpy + pandas
+IMPORT_TIME_BUDGET = 1.0
+HEAVY_MODULES = ['scipy.stats', 'scipy.cluster', 'scipy.optimize', 'scipy.sparse',
+                 'sklearn', 'matplotlib.pyplot', 'seaborn']
+
+def check_import_budget(budget=IMPORT_TIME_BUDGET):
+    
+    """
+    Time a cold import of this module in a fresh interpreter and check
+    that it stays under budget seconds without loading HEAVY_MODULES.
+    Returns a dict with the import time, heavy modules loaded and ok.
+    """
+    
+    import subprocess
+    
+    probe = (
+        "import json, sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {os.path.splitext(os.path.basename(__file__))[0]}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report['budget'] = budget
+    report['ok'] = report['seconds'] <= budget and not report['heavy']
+    
+    print(f"Import time: {report['seconds']:.3f}s (budget {budget:.3f}s) - "
+          f"{'OK' if report['ok'] else 'OVER BUDGET'}")
+    if report['heavy']:
+        print(f"  Heavy modules loaded at import: {', '.join(report['heavy'])}")
+    
+    return report
+
+def query_main(argv=None):
+    
+    """
+    Lightweight CLI for quick questions without the full pipeline:
+    
+      analyze_hitters.py lookup <name> [--data-path P] [--min-year Y] [--min-ab N]
+      analyze_hitters.py team <teamID> [start_year] [end_year] [...]
+      analyze_hitters.py similar <playerID or name> [-k N] [--min-career-ab N] [...]
+      analyze_hitters.py check-imports [--budget SECONDS]
+      analyze_hitters.py serve [--host H] [--port N] [--reload-interval S] [...]
+      analyze_hitters.py generate <output_dir> [--scale N] [--seed S]
+      analyze_hitters.py benchmark [--scales 1 10 100] [--output FILE] [--compare BASELINE.json]
+    
+    Loads only the batting columns from the Parquet cache and never
+    imports scipy, scikit-learn or plotting libraries. Returns an exit code.
+    """
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='analyze_hitters.py')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    lookup = commands.add_parser('lookup', help='find players by (partial) name')
+    lookup.add_argument('name')
+    team = commands.add_parser('team', help='summarize one team over a year range')
+    team.add_argument('team_id')
+    team.add_argument('start_year', type=int, nargs='?')
+    team.add_argument('end_year', type=int, nargs='?')
+    similar = commands.add_parser('similar', help='most similar careers to one player')
+    similar.add_argument('player')
+    similar.add_argument('-k', type=int, default=10)
+    similar.add_argument('--min-career-ab', type=int, default=1000)
+    for sub in (lookup, team, similar):
+        sub.add_argument('--data-path', default='./')
+        sub.add_argument('--min-year', type=int, default=1871)
+        sub.add_argument('--min-ab', type=int, default=1)
+    serve = commands.add_parser('serve', help='answer queries from memory over local HTTP')
+    serve.add_argument('--data-path', default='./')
+    serve.add_argument('--min-year', type=int, default=1871)
+    serve.add_argument('--min-ab', type=int, default=1)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--reload-interval', type=float, default=5.0)
+    imports = commands.add_parser('check-imports', help='check module import time')
+    imports.add_argument('--budget', type=float, default=IMPORT_TIME_BUDGET)
+    generate = commands.add_parser('generate', help='write synthetic Lahman-scale CSVs')
+    generate.add_argument('output_dir')
+    generate.add_argument('--scale', type=int, default=1)
+    generate.add_argument('--seed', type=int, default=0)
+    bench = commands.add_parser('benchmark', help='time each stage on synthetic data')
+    bench.add_argument('--scales', type=int, nargs='+', default=[1])
+    bench.add_argument('--bench-dir', default='./.lahman_bench')
+    bench.add_argument('--output')
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--repeat', type=int, default=1)
+    bench.add_argument('--no-trace-memory', action='store_true')
+    bench.add_argument('--compare', metavar='BASELINE_JSON')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'check-imports':
+        return 0 if check_import_budget(args.budget)['ok'] else 1
+    if args.command == 'generate':
+        counts = generate_synthetic_lahman(os.path.join(args.output_dir, ''), args.scale, args.seed)
+        print(', '.join(f"{name}: {rows:,} rows" for name, rows in counts.items()))
+        return 0
+    if args.command == 'benchmark':
+        report = run_benchmarks(args.scales, args.bench_dir, args.output, args.seed,
+                                not args.no_trace_memory, args.repeat)
+        if args.compare:
+            compare_benchmarks(args.compare, args.output or os.path.join(
+                args.bench_dir, f"benchmark-{report['revision'] or 'local'}.json"))
+        return 0
+    if args.command == 'serve':
+        serve_analysis(args.data_path, args.host, args.port, args.min_year, args.min_ab,
+                       args.reload_interval)
+        return 0
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        batting, people, teams = load_lahman_data(args.data_path, min_year=args.min_year,
+                                                  min_ab=args.min_ab, columns=BATTING_COLUMNS)
+        df = None if batting is None else preprocess_batting_data(
+            batting, people, teams, min_year=args.min_year, min_ab=args.min_ab)
+    if df is None:
+        print(f"Could not load Lahman data from {args.data_path}")
+        return 1
+    load_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    if args.command == 'lookup':
+        result = custom_player_lookup(df, args.name, name_index=build_name_index(df))
+    elif args.command == 'similar':
+        result = player_comparables(df, args.player, args.k, args.min_career_ab,
+                                    name_index=build_name_index(df))
+    else:
+        result = team_analysis(df, args.team_id, args.start_year, args.end_year)
+    
+    print(f"\n(load {load_seconds:.2f}s, query {time.perf_counter() - start:.3f}s)")
+    return 0 if result is not None else 1
+
+# ------------------------------------------------------------------
+# 1️⃣7️⃣ Resident Analysis Server
+# ------------------------------------------------------------------
+
+def _data_signature(data_path):
+    
+    """
+    (size, mtime_ns) of each source CSV; changes trigger a reload. The
+    Parquet cache is left out, since loading rewrites it from the CSVs.
+    """
+    
+    signature = []
+    for name in LAHMAN_TABLES:
+        path = f'{data_path}{name}.csv'
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def load_server_state(data_path='./', min_year=1871, min_ab=1):
+    
+    """
+    Load and preprocess the data once and build everything the server
+    answers from: the pipeline state (season table, career table, league
+    aggregates, era-adjusted columns, aggregate cube) plus the name and
+    team indexes.
+    """
+    
+    start = time.perf_counter()
+    signature = _data_signature(data_path)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        batting, people, teams = load_lahman_data(data_path, min_year=min_year, min_ab=min_ab,
+                                                  columns=BATTING_COLUMNS)
+        if batting is None:
+            raise FileNotFoundError(f"Could not load Lahman data from {data_path}")
+        df = preprocess_batting_data(batting, people, teams, min_year=min_year, min_ab=min_ab)
+    
+    state = build_pipeline_state(df, people)
+    state['name_index'] = build_name_index(df)
+    state['team_index'] = build_team_index(df)
+    state['signature'] = signature
+    state['loaded_at'] = time.time()
+    state['load_seconds'] = time.perf_counter() - start
+    return state
+
+def _json_records(frame):
+    """DataFrame rows as JSON-ready dicts (NaN becomes null, numpy scalars become Python)."""
+    return json.loads(frame.to_json(orient='records'))
+
+def _query_player(state, params):
+    matches = lookup_players(state['name_index'], params['name'])
+    if len(matches) == 0:
+        return []
+    summaries = player_summaries(matches, state['career_table'])
+    return _json_records(summaries.reset_index())
+
+def _query_team(state, params):
+    start_year = int(params['start']) if 'start' in params else None
+    end_year = int(params['end']) if 'end' in params else None
+    team_yearly = team_seasons(state['df'], params['id'], start_year, end_year, cube=state['cube'])
+    return [] if team_yearly is None else _json_records(team_yearly.reset_index())
+
+def _query_rollup(state, params):
+    by = [dim for dim in params.get('by', 'yearID').split(',') if dim]
+    unknown = [dim for dim in by if dim not in state['cube'].index.names]
+    if unknown:
+        raise KeyError(f"unknown dimension: {', '.join(unknown)}")
+    
+    where = {dim: params[dim].split(',') for dim in ('teamID', 'lgID') if dim in params}
+    if any(bound in params for bound in ('start', 'end')):
+        where['yearID'] = (int(params['start']) if 'start' in params else None,
+                           int(params['end']) if 'end' in params else None)
+    return _json_records(cube_rollup(state['cube'], by, where).reset_index())
+
+def _query_top(state, params):
+    df = state['df']
+    metric = params.get('metric', 'OPS')
+    if metric not in df.columns:
+        raise KeyError(f"unknown metric: {metric}")
+    
+    seasons = df[df['AB'] >= int(params.get('min_ab', 300))]
+    if 'year' in params:
+        seasons = seasons[seasons['yearID'] == int(params['year'])]
+    top = seasons.nlargest(int(params.get('n', 10)), metric)
+    return _json_records(top[['playerID', 'fullName', 'yearID', 'teamID', 'AB', metric]])
+
+def _query_era(state, params):
+    df, era = state['df'], state['era']
+    metric = params.get('metric', 'OPS_plus')
+    if metric not in era.columns:
+        raise KeyError(f"unknown era-adjusted metric: {metric}")
+    
+    mask = (df['AB'] >= int(params.get('min_ab', 300))).to_numpy()
+    if 'year' in params:
+        mask = mask & (df['yearID'] == int(params['year'])).to_numpy()
+    if 'name' in params:
+        mask = mask & df.index.isin(lookup_players(state['name_index'], params['name']).index)
+    
+    seasons = era.loc[mask, ['playerID', 'yearID', metric]].assign(fullName=df.loc[mask, 'fullName'])
+    top = seasons.nlargest(int(params.get('n', 10)), metric)
+    return _json_records(top[['playerID', 'fullName', 'yearID', metric]])
+
+# Route -> (handler, required query parameters)
+SERVER_ROUTES = {
+    '/player': (_query_player, ['name']),
+    '/team': (_query_team, ['id']),
+    '/top': (_query_top, []),
+    '/era': (_query_era, []),
+    '/rollup': (_query_rollup, []),
+}
+
+def serve_analysis(data_path='./', host='127.0.0.1', port=8765, min_year=1871, min_ab=1,
+                   reload_interval=5.0):
+    
+    """
+    Serve Lahman queries from memory over local HTTP with JSON responses.
+    
+      GET /player?name=trout                     career lines of matching players
+      GET /team?id=BOS&start=2000&end=2010       team yearly aggregates
+      GET /top?metric=OPS&n=10&year=2010         top-N seasons (min_ab=300)
+      GET /era?metric=OPS_plus&n=10&name=ruth    top era-adjusted seasons
+      GET /rollup?by=yearID,lgID&teamID=NYY,BOS  aggregate-cube roll-up (start/end years)
+      GET /health                                load time, reloads, latency stats
+    
+    Data is loaded once; every response carries its latency_ms, which is
+    also logged. A background thread polls the source CSVs every
+    reload_interval seconds and swaps in a freshly built state when they
+    change, so requests never see a half-built state. A failing query
+    returns a 500 JSON error and its traceback is logged.
+    """
+    
+    import threading
+    import traceback
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qsl, urlsplit
+    
+    current = {'state': load_server_state(data_path, min_year, min_ab)}
+    stats_lock = threading.Lock()
+    server_stats = {'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'reloads': 0}
+    
+    class AnalysisHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = time.perf_counter()
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            state = current['state']
+            
+            status = 200
+            try:
+                if url.path == '/health':
+                    with stats_lock:
+                        body = dict(server_stats, rows=len(state['df']),
+                                    loaded_at=state['loaded_at'], load_seconds=state['load_seconds'])
+                elif url.path in SERVER_ROUTES:
+                    handler, required = SERVER_ROUTES[url.path]
+                    missing = [name for name in required if name not in params]
+                    if missing:
+                        status, body = 400, {'error': f"missing parameter(s): {', '.join(missing)}"}
+                    else:
+                        body = {'results': handler(state, params)}
+                else:
+                    status, body = 404, {'error': f"unknown route: {url.path}"}
+            except (KeyError, ValueError) as e:
+                status, body = 400, {'error': str(e.args[0]) if e.args else str(e)}
+            except Exception as e:
+                traceback.print_exc()
+                status, body = 500, {'error': f"internal error: {type(e).__name__}: {e}"}
+            
+            latency_ms = (time.perf_counter() - start) * 1000
+            body['latency_ms'] = round(latency_ms, 3)
+            payload = json.dumps(body).encode()
+            
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            
+            with stats_lock:
+                server_stats['requests'] += 1
+                server_stats['total_ms'] += latency_ms
+                server_stats['max_ms'] = max(server_stats['max_ms'], latency_ms)
+            print(f"{self.command} {self.path} -> {status} ({latency_ms:.2f} ms)", flush=True)
+        
+        def log_message(self, format, *args):
+            # Requests are logged with their latency in do_GET
+            pass
+    
+    server = ThreadingHTTPServer((host, port), AnalysisHandler)
+    stop = threading.Event()
+    
+    def watch_data():
+        while not stop.wait(reload_interval):
+            if _data_signature(data_path) == current['state']['signature']:
+                continue
+            try:
+                current['state'] = load_server_state(data_path, min_year, min_ab)
+            except Exception as e:
+                print(f"Reload failed, keeping previous data: {e}", flush=True)
+                continue
+            with stats_lock:
+                server_stats['reloads'] += 1
+            print(f"Data changed - reloaded {len(current['state']['df']):,} rows "
+                  f"in {current['state']['load_seconds']:.2f}s", flush=True)
+    
+    watcher = threading.Thread(target=watch_data, daemon=True)
+    watcher.start()
+    
+    state = current['state']
+    print(f"Loaded {len(state['df']):,} player-seasons in {state['load_seconds']:.2f}s")
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]} "
+          f"(routes: {', '.join(list(SERVER_ROUTES) + ['/health'])})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+# ------------------------------------------------------------------
+# 1️⃣8️⃣ Synthetic Data and Stage Benchmarks
+# ------------------------------------------------------------------
+
+# Approximate row counts of the real Lahman tables (1871-2023) at scale 1
+LAHMAN_SCALE_ROWS = {'People': 20_700, 'Batting': 113_000, 'Teams': 3_000}
+SYNTHETIC_YEARS = (1871, 2023)
+SYNTHETIC_TEAMS = ['BOS', 'NYA', 'CHN', 'PHI', 'PIT', 'CIN', 'SLN', 'DET', 'CLE', 'CHA',
+                   'BRO', 'NY1', 'WS1', 'PHA', 'SLA', 'BSN', 'LAN', 'SFN', 'MIN', 'HOU',
+                   'NYN', 'ATL', 'OAK', 'KCA', 'SDN', 'MON', 'SEA', 'TOR', 'TEX', 'MIL']
+SYNTHETIC_FIRST_NAMES = ['Hank', 'Babe', 'Ted', 'Willie', 'Mickey', 'Stan', 'Ken', 'Barry', 'Derek',
+                         'Albert', 'José', 'Iván', 'Roberto', 'Miguel', 'Frank', 'Joe', 'Lou', 'Mike']
+SYNTHETIC_LAST_NAMES = ['Aaron', 'Ruth', 'Williams', 'Mays', 'Mantle', 'Musial', 'Griffey', 'Bonds',
+                        'Jeter', 'Pujols', 'Peña', 'Rodríguez', 'Clemente', 'Cabrera', 'Robinson',
+                        'DiMaggio', 'Gehrig', 'Trout', 'Smith', 'Jones', 'Martínez', 'Ortiz']
+SYNTHETIC_BLOCK_PLAYERS = 100_000
+
+def _synthetic_team_counts(years, scale):
+    """Teams per season: league expansion steps, multiplied by scale."""
+    base = np.select([years < 1901, years < 1961, years < 1977, years < 1998], [8, 16, 20, 26], 30)
+    return base * scale
+
+def _synthetic_team_ids(n_teams):
+    """Lahman-style team codes; scaled-up leagues reuse them with a numeric suffix."""
+    base = np.array(SYNTHETIC_TEAMS)
+    idx = np.arange(n_teams)
+    suffix = np.where(idx < len(base), '', (idx // len(base)).astype(str))
+    return np.char.add(base[idx % len(base)], suffix)
+
+def _synthetic_block(rng, first_player, n_players, scale):
+    
+    """
+    People, Batting and HallOfFame rows for one block of players.
+    
+    Each player gets a latent talent (contact, power, eye, strikeouts)
+    that drives binomial season lines, so year-over-year stability and
+    career aggregates behave like real data; ~8% of seasons are split
+    across two stints.
+    """
+    
+    first_year, last_year = SYNTHETIC_YEARS
+    ids = np.char.add('syn', np.char.zfill(np.arange(first_player, first_player + n_players).astype(str), 7))
+    
+    # Debuts weighted toward recent seasons, as in the real player pool
+    debut = (first_year + (last_year - first_year) * np.sqrt(rng.random(n_players))).astype(np.int64)
+    length = np.minimum(rng.geometric(0.18, n_players), last_year - debut + 1)
+    birth = debut - rng.integers(20, 27, n_players)
+    
+    talent = {
+        'contact': rng.normal(0.255, 0.025, n_players).clip(0.15, 0.36),
+        'power': rng.beta(2, 16, n_players),
+        'eye': rng.normal(0.085, 0.025, n_players).clip(0.02, 0.2),
+        'strikeouts': rng.normal(0.17, 0.05, n_players).clip(0.04, 0.4),
+    }
+    
+    people = pd.DataFrame({
+        'playerID': ids,
+        'birthYear': birth,
+        'nameFirst': rng.choice(SYNTHETIC_FIRST_NAMES, n_players),
+        'nameLast': rng.choice(SYNTHETIC_LAST_NAMES, n_players),
+        'bats': rng.choice(['R', 'L', 'B'], n_players, p=[0.6, 0.3, 0.1]),
+        'throws': rng.choice(['R', 'L'], n_players, p=[0.75, 0.25]),
+        'debut': pd.Series(debut.astype(str)) + '-04-01',
+        'finalGame': pd.Series((debut + length - 1).astype(str)) + '-09-30',
+    })
+    
+    # One row per season, a second stint for ~8% of seasons
+    player = np.repeat(np.arange(n_players), length)
+    year = debut[player] + (np.arange(len(player)) - np.repeat(np.cumsum(length) - length, length))
+    split = rng.random(len(player)) < 0.08
+    player = np.concatenate([player, player[split]])
+    year = np.concatenate([year, year[split]])
+    stint = np.concatenate([np.ones(len(split), np.int64), np.full(split.sum(), 2)])
+    order = np.lexsort((stint, year, player))
+    player, year, stint = player[order], year[order], stint[order]
+    n = len(player)
+    
+    team_counts = _synthetic_team_counts(year, scale)
+    home_team = rng.integers(0, _synthetic_team_counts(debut, scale))[player]
+    team = np.where(stint == 1, home_team % team_counts, rng.integers(0, team_counts))
+    
+    ab = np.where(rng.random(n) < 0.3, rng.integers(0, 60, n), rng.integers(60, 650, n))
+    ab = np.where(stint == 2, ab // 3, ab)
+    h = rng.binomial(ab, talent['contact'][player])
+    hr = rng.binomial(h, talent['power'][player])
+    doubles = rng.binomial(h - hr, 0.2)
+    triples = rng.binomial(h - hr - doubles, 0.03)
+    bb = rng.binomial(ab, talent['eye'][player])
+    so = rng.binomial(ab, talent['strikeouts'][player])
+    sf = rng.binomial(ab, 0.008).astype(float)
+    ibb = rng.binomial(bb, 0.08).astype(float)
+    sf[year < 1954], ibb[year < 1955] = np.nan, np.nan
+    
+    batting = pd.DataFrame({
+        'playerID': ids[player], 'yearID': year, 'stint': stint,
+        'teamID': _synthetic_team_ids(team_counts.max())[team],
+        'lgID': np.where(team % 2 == 0, 'AL', 'NL'),
+        'G': np.minimum(ab // 4 + rng.integers(0, 10, n), 162), 'AB': ab,
+        'R': rng.binomial(h + bb, 0.45), 'H': h, '2B': doubles, '3B': triples, 'HR': hr,
+        'RBI': rng.binomial(h + hr, 0.45), 'SB': rng.binomial(h, 0.06), 'CS': rng.binomial(h, 0.03),
+        'BB': bb, 'SO': so, 'IBB': ibb, 'HBP': rng.binomial(ab, 0.01), 'SH': rng.binomial(ab, 0.005),
+        'SF': sf, 'GIDP': rng.binomial(h, 0.08),
+    })
+    
+    # Long careers appear on the ballot; the strongest hitters are inducted
+    eligible = np.flatnonzero((length >= 10) & (debut + length + 5 <= last_year))
+    score = (talent['contact'] + 2 * talent['power'] + talent['eye'])[eligible] * np.log(length[eligible])
+    hall_of_fame = pd.DataFrame({
+        'playerID': ids[eligible], 'yearid': debut[eligible] + length[eligible] + 5,
+        'votedBy': 'BBWAA', 'inducted': np.where(score > np.quantile(score, 0.93), 'Y', 'N')
+        if len(score) else [], 'category': 'Player',
+    })
+    
+    return people, batting, hall_of_fame
+
+def generate_synthetic_lahman(output_path, scale=1, seed=0):
+    
+    """
+    Write schema-valid synthetic People, Batting, Teams and HallOfFame
+    CSVs at `scale` times the real Lahman size (1, 10, 100, ...).
+    
+    Players are generated and appended in blocks of SYNTHETIC_BLOCK_PLAYERS
+    so memory stays flat from 10x upward. The same (scale, seed) always
+    produces the same files. Returns the row counts written.
+    """
+    
+    os.makedirs(output_path, exist_ok=True)
+    n_players = LAHMAN_SCALE_ROWS['People'] * scale
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_players // SYNTHETIC_BLOCK_PLAYERS) + 1)
+    counts = {'People': 0, 'Batting': 0, 'HallOfFame': 0}
+    
+    for block, first_player in enumerate(range(0, n_players, SYNTHETIC_BLOCK_PLAYERS)):
+        rng = np.random.default_rng(seeds[block + 1])
+        size = min(SYNTHETIC_BLOCK_PLAYERS, n_players - first_player)
+        tables = dict(zip(['People', 'Batting', 'HallOfFame'], _synthetic_block(rng, first_player, size, scale)))
+        for name, table in tables.items():
+            table.to_csv(os.path.join(output_path, f'{name}.csv'), index=False,
+                         mode='w' if block == 0 else 'a', header=block == 0)
+            counts[name] += len(table)
+    
+    rng = np.random.default_rng(seeds[0])
+    years = np.arange(SYNTHETIC_YEARS[0], SYNTHETIC_YEARS[1] + 1)
+    team_counts = _synthetic_team_counts(years, scale)
+    team_ids = _synthetic_team_ids(team_counts.max())
+    year = np.repeat(years, team_counts)
+    team = np.arange(len(year)) - np.repeat(np.cumsum(team_counts) - team_counts, team_counts)
+    wins = rng.integers(55, 108, len(year))
+    teams = pd.DataFrame({
+        'yearID': year, 'lgID': np.where(team % 2 == 0, 'AL', 'NL'), 'teamID': team_ids[team],
+        'franchID': team_ids[team], 'divID': np.where(year >= 1969, 'E', ''), 'W': wins, 'L': 162 - wins,
+        'name': np.char.add(team_ids[team], ' Club'), 'park': np.char.add(team_ids[team], ' Park'),
+    })
+    teams.to_csv(os.path.join(output_path, 'Teams.csv'), index=False)
+    counts['Teams'] = len(teams)
+    
+    return counts
+
+def _current_rss_mb():
+    """Current resident set size in MB from /proc, or None where it is unavailable."""
+    
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+@contextlib.contextmanager
+def _rss_rise(interval=0.005):
+    
+    """
+    Peak rise of RSS above its value on entry while the block runs,
+    sampled every interval seconds by a background thread. Unlike
+    tracemalloc it includes native buffers (Arrow, Polars, DuckDB); memory
+    the allocator already holds from earlier work can hide part of the
+    rise. Yields a dict whose 'mb' is set on exit (None without /proc).
+    """
+    
+    import threading
+    
+    measured = {'mb': None}
+    start = _current_rss_mb()
+    if start is None:
+        yield measured
+        return
+    
+    peak = [start]
+    stop = threading.Event()
+    
+    def sample():
+        while not stop.wait(interval):
+            peak[0] = max(peak[0], _current_rss_mb())
+    
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield measured
+    finally:
+        stop.set()
+        sampler.join()
+        measured['mb'] = round(max(peak[0], _current_rss_mb()) - start, 2)
+
+def _measure_stage(func, args, trace_memory=True, repeat=1, setup=None):
+    
+    """
+    Best-of-repeat wall time of func(*args) with its output suppressed and
+    the largest RSS rise over those runs (_rss_rise), then (optionally) one
+    more run under tracemalloc for its peak Python heap allocation, which
+    includes NumPy buffers. setup() runs before every call, e.g. to drop
+    memoized results.
+    """
+    
+    best, rss_rise = float('inf'), None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()), _rss_rise() as rss:
+            start = time.perf_counter()
+            result = func(*args)
+            best = min(best, time.perf_counter() - start)
+        if rss['mb'] is not None:
+            rss_rise = max(rss_rise or 0.0, rss['mb'])
+    
+    measurement = {'seconds': round(best, 4), 'rss_rise_mb': rss_rise, 'tracemalloc_peak_mb': None}
+    if trace_memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func(*args)
+            measurement['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024**2, 2)
+        finally:
+            tracemalloc.stop()
+    return result, measurement
+
+def benchmark_stages(data_path, stages=PIPELINE_STAGES, trace_memory=True, repeat=1,
+                     min_year=1980, min_ab=50, backends=QUERY_BACKENDS):
+    
+    """
+    Time loading, preprocessing and every pipeline stage on one dataset.
+    
+    Stages run in declared order with their dependencies' results, the
+    same as run_pipeline_stages(workers=1). Each installed backend is
+    also timed end to end from the Parquet cache: load+preprocess[...]
+    for the season table and pipeline_tables[...] adding the league and
+    career aggregates (tracemalloc misses the engines' native buffers,
+    which rss_rise_mb includes). Returns a list of
+    {stage, seconds, rss_rise_mb, tracemalloc_peak_mb} records.
+    """
+    
+    records = []
+    
+    def measure(name, func, *args):
+        # Stages that read the league-season cache must not reuse an earlier run's entry
+        result, measurement = _measure_stage(func, args, trace_memory, repeat,
+                                             setup=clear_league_season_cache)
+        records.append({'stage': name, **measurement})
+        return result
+    
+    cache_dir = f'{data_path}{CACHE_DIR_NAME}'
+    measure('load_csv', lambda: load_lahman_data(data_path, use_cache=False, min_year=min_year,
+                                                 min_ab=min_ab, columns=BATTING_COLUMNS))
+    measure('build_cache', lambda: load_lahman_data(data_path, refresh_cache=True, cache_dir=cache_dir,
+                                                    min_year=min_year, min_ab=min_ab, columns=BATTING_COLUMNS))
+    batting, people, teams = measure('load_cached', lambda: load_lahman_data(
+        data_path, cache_dir=cache_dir, min_year=min_year, min_ab=min_ab, columns=BATTING_COLUMNS))
+    df = measure('preprocess_batting_data', preprocess_batting_data, batting, people, teams, min_year, min_ab)
+    
+    def pandas_tables():
+        seasons = preprocess_batting_data(*load_lahman_data(data_path, cache_dir=cache_dir, min_year=min_year,
+                                                            min_ab=min_ab, columns=BATTING_COLUMNS),
+                                          min_year, min_ab)
+        return seasons, league_season_aggregates(seasons), build_career_table(seasons)
+    
+    for backend in backends:
+        if backend == 'pandas':
+            measure('load+preprocess[pandas]', lambda: preprocess_batting_data(
+                *load_lahman_data(data_path, cache_dir=cache_dir, min_year=min_year, min_ab=min_ab,
+                                  columns=BATTING_COLUMNS), min_year, min_ab))
+            measure('pipeline_tables[pandas]', pandas_tables)
+        elif importlib.util.find_spec(backend) is not None:
+            measure(f'load+preprocess[{backend}]', preprocess_lazy, data_path, backend, min_year, min_ab)
+            measure(f'pipeline_tables[{backend}]', lazy_pipeline_tables, data_path, backend, min_year, min_ab)
+    
+    results = {}
+    for name, func, deps in stages:
+        results[name] = measure(name, func, df, *[results[dep] for dep in deps])
+    
+    return records
+
+def _git_revision():
+    import subprocess
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(scales=(1,), bench_dir='./.lahman_bench', output=None, seed=0,
+                   trace_memory=True, repeat=1):
+    
+    """
+    Generate (once) a synthetic dataset per scale under bench_dir and run
+    benchmark_stages on each. The results, tagged with the git revision
+    and library versions, are written as JSON to output (default
+    bench_dir/benchmark-<revision>.json) and returned.
+    """
+    
+    import platform
+    
+    report = {
+        'revision': _git_revision(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(), 'seed': seed, 'runs': [],
+    }
+    
+    for scale in scales:
+        data_path = os.path.join(bench_dir, f'scale_{scale}x') + os.sep
+        manifest_path = os.path.join(data_path, 'synthetic.json')
+        manifest = {'scale': scale, 'seed': seed}
+        
+        existing = None
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as fh:
+                existing = json.load(fh)
+        if existing is None or {k: existing.get(k) for k in manifest} != manifest:
+            print(f"Generating synthetic Lahman data at {scale}x...")
+            start = time.perf_counter()
+            manifest['rows'] = generate_synthetic_lahman(data_path, scale, seed)
+            manifest['generate_seconds'] = round(time.perf_counter() - start, 2)
+            with open(manifest_path, 'w') as fh:
+                json.dump(manifest, fh)
+        else:
+            manifest = existing
+        
+        print(f"Benchmarking {scale}x ({manifest['rows']['Batting']:,} batting rows)...")
+        stages = benchmark_stages(data_path, trace_memory=trace_memory, repeat=repeat)
+        report['runs'].append({'scale': scale, 'rows': manifest['rows'], 'stages': stages})
+        
+        for record in stages:
+            traced, rss = record['tracemalloc_peak_mb'], record['rss_rise_mb']
+            print(f"  {record['stage']:25s} {record['seconds']:9.3f}s"
+                  + (f" {traced:10.1f} MB traced" if traced is not None else '')
+                  + (f" {rss:10.1f} MB RSS rise" if rss is not None else ''))
+    
+    if output is None:
+        output = os.path.join(bench_dir, f"benchmark-{report['revision'] or 'local'}.json")
+    with open(output, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Benchmark results written to {output}")
+    
+    return report
+
+def compare_benchmarks(baseline_path, candidate_path):
+    
+    """
+    Per-stage time and memory ratios (candidate / baseline) for the
+    scales present in both benchmark JSON files. Memory compares the
+    tracemalloc peaks, or the RSS rises for stages where either run was
+    made without tracing; it is left out where neither is available.
+    """
+    
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    with open(candidate_path) as fh:
+        candidate = json.load(fh)
+    
+    memory_columns = ['tracemalloc_peak_mb', 'rss_rise_mb']
+    
+    def records(report):
+        frame = pd.DataFrame([{'scale': run['scale'], **stage} for run in report['runs'] for stage in run['stages']])
+        # Runs without tracing (or from before rss_rise_mb) have None or no column
+        for col in memory_columns:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce') if col in frame else np.nan
+        return frame
+    
+    def ratio(col):
+        return (merged[f'{col}_new'] / merged[f'{col}_base']).replace([np.inf, -np.inf], np.nan)
+    
+    merged = records(baseline).merge(records(candidate), on=['scale', 'stage'], suffixes=('_base', '_new'))
+    merged['time_ratio'] = merged['seconds_new'] / merged['seconds_base']
+    traced = ratio('tracemalloc_peak_mb')
+    merged['memory_ratio'] = traced.fillna(ratio('rss_rise_mb'))
+    merged['memory_measure'] = np.where(traced.notna(), 'traced', np.where(merged['memory_ratio'].notna(), 'RSS rise', None))
+    comparison = merged.set_index(['scale', 'stage'])[['seconds_base', 'seconds_new', 'time_ratio',
+                                                       'memory_ratio', 'memory_measure']]
+    
+    print(f"\nBenchmark comparison: {baseline.get('revision')} -> {candidate.get('revision')}")
+    print("-" * 70)
+    for (scale, stage), row in comparison.iterrows():
+        memory = (f", x{row['memory_ratio']:.2f} memory ({row['memory_measure']})"
+                  if pd.notna(row['memory_ratio']) else '')
+        print(f"  {scale:>4}x {stage:25s} {row['seconds_base']:8.3f}s -> {row['seconds_new']:8.3f}s "
+              f"(x{row['time_ratio']:.2f} time{memory})")
+    
+    return comparison
+
+if __name__ == "__main__" and sys.argv[1:2] in [[command] for command in QUERY_COMMANDS]:
+    sys.exit(query_main())
+
 # ---------------------------------
 # Note: Data from Lahman database files
 # ---------------------------------
\ No newline at end of file